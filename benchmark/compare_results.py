@@ -0,0 +1,39 @@
+import argparse
+import json
+
+import pandas as pd
+
+# Metrik yang dibandingkan antar dua hasil benchmark (rasio > 1 berarti hasil baru lebih besar/lambat)
+COMPARED_METRICS = ['wall_seconds', 'cpu_seconds', 'peak_rss_bytes', 'warm_seconds']
+
+
+def load_stages(path):
+    """Membaca file JSON hasil run_benchmark.py sebagai DataFrame berindeks nama stage."""
+    with open(path) as f:
+        report = json.load(f)
+    return report['meta'], pd.DataFrame(report['stages']).set_index('stage')
+
+
+def compare(base_path, new_path):
+    """Tabel perbandingan metrik per stage antara dua run."""
+    base_meta, base = load_stages(base_path)
+    new_meta, new = load_stages(new_path)
+    print(f"Baseline: {base_meta['git_revision']} ({base_meta['started_at']})")
+    print(f"Baru    : {new_meta['git_revision']} ({new_meta['started_at']})\n")
+    stages = [stage for stage in new.index if stage in base.index]
+    rows = {}
+    for metric in COMPARED_METRICS:
+        if metric not in base or metric not in new:
+            continue
+        rows[f'{metric}_base'] = base.loc[stages, metric]
+        rows[f'{metric}_new'] = new.loc[stages, metric]
+        rows[f'{metric}_ratio'] = new.loc[stages, metric].astype(float) / base.loc[stages, metric].astype(float)
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Membandingkan dua file JSON hasil benchmark.')
+    parser.add_argument('base', help='JSON baseline (mis. dari commit sebelumnya).')
+    parser.add_argument('new', help='JSON run baru.')
+    args = parser.parse_args()
+    print(compare(args.base, args.new).round(4).to_string())
@@ -0,0 +1,106 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, Date, ForeignKey, Integer, MetaData, Numeric, String, Table, Text
+
+from data_generator.generate_data import load_seed_database, write_dataset
+
+# Tanggal acuan pengganti NOW() agar data transaksi stand-in selalu sama antar run
+REFERENCE_DATE = '2025-07-04'
+
+
+def generate_transactions(customer_ids, address_ids, seed=42):
+    """Emulasi NumPy dari skrip 10-12: customer_address, cust_order dan order_line dengan volume yang sama."""
+    rng = np.random.default_rng(seed)
+    # 10: satu alamat aktif per pelanggan, lalu 750 alamat aktif kedua, 400 tidak aktif dan 200 aktif tambahan
+    extra_counts = [(750, 1), (400, 2), (200, 1)]
+    customer_address = pd.concat(
+        [pd.DataFrame({'customer_id': customer_ids, 'address_id': rng.choice(address_ids, len(customer_ids)), 'status_id': 1})] +
+        [pd.DataFrame({'customer_id': rng.choice(customer_ids, count), 'address_id': rng.choice(address_ids, count), 'status_id': status})
+         for count, status in extra_counts]
+    ).drop_duplicates(['customer_id', 'address_id']).sort_values(['customer_id', 'address_id'], ignore_index=True)
+
+    # 11: 7550 pesanan dalam 3 tahun terakhir, alamat tujuan diambil dari alamat pelanggan
+    order_count = 7550
+    picked = rng.integers(0, len(customer_address), order_count)
+    seconds_back = rng.integers(0, 365 * 3 * 24 * 60 * 60, order_count)
+    cust_order = pd.DataFrame({
+        'order_id': np.arange(1, order_count + 1),
+        'order_date': (pd.Timestamp(REFERENCE_DATE) - pd.to_timedelta(seconds_back, unit='s')).strftime('%Y-%m-%d %H:%M:%S'),
+        'customer_id': customer_address['customer_id'].to_numpy()[picked],
+        'shipping_method_id': rng.integers(1, 5, order_count),
+        'dest_address_id': customer_address['address_id'].to_numpy()[picked],
+    })
+
+    # 12: satu baris untuk setiap pesanan ditambah 7850 baris untuk pesanan acak
+    order_ids = np.concatenate([cust_order['order_id'].to_numpy(), rng.integers(1, order_count + 1, 4000 + 2000 + 1000 + 300 + 500 + 50)])
+    order_line = pd.DataFrame({
+        'line_id': np.arange(1, len(order_ids) + 1),
+        'order_id': order_ids,
+        'book_id': rng.integers(1, 11127, len(order_ids)),
+        'price': np.round(rng.random(len(order_ids)) * 20, 2),
+    })
+    return {'customer_address': customer_address, 'cust_order': cust_order, 'order_line': order_line}
+
+
+def build_source_sqlite(path, seed=42, scale=None):
+    """Membuat database sumber gravity_books di SQLite dari source_sql/ (tanpa MySQL).
+
+    Dengan `scale`, seluruh data dibuat oleh data_generator pada scale factor tersebut.
+    """
+    if scale is not None:
+        write_dataset(path, 'sqlite', scale, seed=seed)
+        return
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        load_seed_database(connection)
+        customer_ids = pd.read_sql_query('SELECT customer_id FROM customer ORDER BY customer_id', connection)['customer_id'].to_numpy()
+        address_ids = pd.read_sql_query('SELECT address_id FROM address ORDER BY address_id', connection)['address_id'].to_numpy()
+        for table, df in generate_transactions(customer_ids, address_ids, seed).items():
+            df.to_sql(table, connection, if_exists='append', index=False)
+        # SQLite menyimpan baris sesuai urutan insert; samakan dengan urutan primary key seperti InnoDB
+        book_author = pd.read_sql_query('SELECT * FROM book_author ORDER BY book_id, author_id', connection)
+        connection.execute('DELETE FROM book_author')
+        book_author.to_sql('book_author', connection, if_exists='append', index=False)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def dwh_metadata():
+    """Definisi skema bintang gravity_books_dwh yang portabel (SQLite maupun MySQL)."""
+    metadata = MetaData()
+    Table('dim_date', metadata,
+          Column('date_sk', Integer, primary_key=True, autoincrement=False),
+          Column('full_date', Date), Column('day_val', Integer), Column('month_val', Integer), Column('year_val', Integer),
+          Column('quarter_val', Integer), Column('day_name', String(20)), Column('month_name', String(20)))
+    Table('dim_customer', metadata,
+          Column('customer_sk', Integer, primary_key=True, autoincrement=True),
+          Column('customer_id', Integer), Column('first_name', String(200)), Column('last_name', String(200)),
+          Column('email', String(350)), Column('address_status', String(30)), Column('street_number', String(10)),
+          Column('street_name', String(200)), Column('city', String(100)), Column('country', String(200)))
+    Table('dim_book', metadata,
+          Column('book_sk', Integer, primary_key=True, autoincrement=True),
+          Column('book_id', Integer), Column('title', String(400)), Column('isbn13', String(13)), Column('language_code', String(8)),
+          Column('language_name', String(50)), Column('num_pages', Integer), Column('publication_date', Date),
+          Column('publisher_name', String(400)), Column('author_name', Text))
+    Table('dim_shipping', metadata,
+          Column('shipping_sk', Integer, primary_key=True, autoincrement=True),
+          Column('shipping_method_id', Integer), Column('shipping_method', String(100)))
+    Table('fact_book_sales', metadata,
+          Column('sales_sk', Integer, primary_key=True, autoincrement=True),
+          Column('customer_sk', Integer, ForeignKey('dim_customer.customer_sk')),
+          Column('book_sk', Integer, ForeignKey('dim_book.book_sk')),
+          Column('shipping_sk', Integer, ForeignKey('dim_shipping.shipping_sk')),
+          Column('date_sk', Integer, ForeignKey('dim_date.date_sk')),
+          Column('price', Numeric(5, 2)), Column('shipping_cost', Numeric(6, 2)))
+    return metadata
+
+
+def create_dwh_schema(engine):
+    """Membuat tabel DWH yang belum ada."""
+    dwh_metadata().create_all(engine)
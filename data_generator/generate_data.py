@@ -0,0 +1,384 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from etl_common.bulk_load import write_tsv
+
+# --- 1. KONFIGURASI ---
+SOURCE_SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'source_sql')
+# Skrip berisi data statis (INSERT ... VALUES) yang dipakai sebagai kosakata: nama, judul, kota, negara, lookup
+SEED_SCRIPT_PREFIXES = ['02', '03', '04', '05', '06', '07', '08', '09']
+# Jumlah baris pada scale factor 1 (sama dengan dataset asli source_sql/)
+BASE_ROWS = {
+    'author': 9235, 'publisher': 2264, 'book': 11127, 'address': 1000, 'customer': 2000, 'cust_order': 7550,
+}
+# Katalog (buku, penulis, penerbit) tumbuh dengan akar scale factor; pelanggan, alamat dan transaksi tumbuh linear
+SQRT_SCALED_TABLES = {'author', 'publisher', 'book'}
+# Rata-rata baris per pesanan dan penulis per buku pada dataset asli (15400 / 7550 dan 17642 / 11127)
+LINES_PER_ORDER = 15400 / 7550
+AUTHORS_PER_BOOK = 17642 / 11127
+# Kemiringan distribusi Zipf: popularitas buku, jumlah pelanggan per negara, penerbit per buku, penulis per buku
+BOOK_POPULARITY_SKEW = 0.8
+COUNTRY_SKEW = 1.0
+PUBLISHER_SKEW = 1.0
+AUTHOR_SKEW = 0.8
+# Proporsi metode pengiriman (Standard, Priority, Express, International)
+SHIPPING_METHOD_SHARE = [0.55, 0.25, 0.12, 0.08]
+# Rentang tanggal pesanan: YEARS tahun ke belakang dari REFERENCE_DATE, tumbuh ANNUAL_GROWTH per tahun + musiman akhir tahun
+REFERENCE_DATE = '2025-07-04'
+ORDER_YEARS = 3
+ANNUAL_GROWTH = 0.35
+# Pesanan per chunk: tabel transaksi dibuat dan ditulis per chunk sehingga memori tetap rata berapa pun scale factor-nya
+ORDER_CHUNK_SIZE = 1_000_000
+OUTPUT_FORMATS = ('parquet', 'tsv', 'sqlite')
+# Urutan tabel yang aman terhadap foreign key saat dimuat
+TABLE_ORDER = ['author', 'publisher', 'book_language', 'book', 'book_author', 'address_status', 'country', 'address', 'customer',
+               'customer_address', 'shipping_method', 'cust_order', 'order_status', 'order_line', 'order_history']
+
+
+def mysql_to_sqlite(sql):
+    """Menyesuaikan skrip MySQL gravity_books agar bisa dijalankan di SQLite."""
+    sql = re.sub(r'^\s*(CREATE DATABASE|USE)\s+\w+;', '', sql, flags=re.MULTILINE)
+    sql = sql.replace('AUTO_INCREMENT', '')
+    # MySQL menggabungkan literal string yang berdampingan ('a' 'b' = 'ab'), SQLite tidak
+    return re.sub(r"'[ \t]+'", '', sql)
+
+
+def read_source_script(prefix):
+    """Isi skrip source_sql/ berawalan nomor tertentu (mis. '01')."""
+    name = next(f for f in sorted(os.listdir(SOURCE_SQL_DIR)) if f.startswith(prefix))
+    with open(os.path.join(SOURCE_SQL_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def load_seed_database(connection):
+    """Membuat skema gravity_books dan mengisi data statis source_sql/ ke koneksi SQLite."""
+    connection.executescript(mysql_to_sqlite(read_source_script('01')))
+    for prefix in SEED_SCRIPT_PREFIXES:
+        connection.executescript(mysql_to_sqlite(read_source_script(prefix)))
+
+
+def load_vocabulary():
+    """Kosakata dan tabel lookup dari dataset asli, dibaca lewat SQLite in-memory."""
+    connection = sqlite3.connect(':memory:')
+    try:
+        load_seed_database(connection)
+        column = lambda sql: pd.read_sql_query(sql, connection).iloc[:, 0].dropna().astype(str).to_numpy()
+        titles = pd.read_sql_query('SELECT title FROM book', connection)['title'].dropna()
+        title_words = titles.str.split().explode()
+        vocabulary = {
+            'author_names': column('SELECT author_name FROM author ORDER BY author_id'),
+            'publisher_names': column('SELECT publisher_name FROM publisher ORDER BY publisher_id'),
+            # Frekuensi kata judul dipertahankan sehingga kata umum ("The", "of") tetap sering muncul
+            'title_words': title_words.value_counts(),
+            'first_names': column('SELECT DISTINCT first_name FROM customer'),
+            'last_names': column('SELECT DISTINCT last_name FROM customer'),
+            'email_domains': column("SELECT DISTINCT substr(email, instr(email, '@') + 1) FROM customer"),
+            'street_names': column('SELECT DISTINCT street_name FROM address'),
+            'cities': column('SELECT DISTINCT city FROM address'),
+        }
+        for table in ['country', 'book_language', 'shipping_method', 'address_status', 'order_status']:
+            vocabulary[table] = pd.read_sql_query(f'SELECT * FROM {table} ORDER BY 1', connection)
+        return vocabulary
+    finally:
+        connection.close()
+
+
+def scaled_rows(table, scale):
+    """Jumlah baris sebuah tabel pada scale factor tertentu (minimal 1)."""
+    factor = np.sqrt(scale) if table in SQRT_SCALED_TABLES else scale
+    return max(1, int(round(BASE_ROWS[table] * factor)))
+
+
+def zipf_cdf(n, skew, rng=None):
+    """CDF Zipf untuk n item; jika rng diberikan, peringkat diacak agar item populer tidak selalu id kecil."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    if rng is not None:
+        weights = weights[rng.permutation(n)]
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def sample_cdf(rng, cdf, size):
+    """Mengambil `size` indeks (0-based) mengikuti CDF dengan satu searchsorted (tanpa loop Python)."""
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side='right'), len(cdf) - 1)
+
+
+def take(values, indices):
+    """Array Arrow berisi values[indices] (values berupa array NumPy/list string)."""
+    return pa.array(values).take(pa.array(indices))
+
+
+def join_strings(*arrays, sep=' '):
+    """Menggabungkan beberapa array string per elemen (null dilewati)."""
+    return pc.binary_join_element_wise(*arrays, sep, null_handling='skip')
+
+
+def to_timestamps(seconds):
+    """Detik sejak epoch -> array Arrow timestamp[ns] (tipe yang sama dengan hasil ekstraksi MySQL)."""
+    return pa.array(np.asarray(seconds, dtype='datetime64[s]').astype('datetime64[ns]'))
+
+
+def generate_catalog(scale, rng, vocabulary):
+    """Penulis, penerbit, buku dan book_author."""
+    n_authors, n_publishers, n_books = (scaled_rows(t, scale) for t in ['author', 'publisher', 'book'])
+    first = vocabulary['first_names']
+    last = vocabulary['last_names']
+    # Nama penulis asli dipakai lebih dulu; di atas jumlah aslinya dibentuk dari nama depan + belakang
+    real_authors = vocabulary['author_names'][:n_authors]
+    extra = n_authors - len(real_authors)
+    author_names = pa.concat_arrays([pa.array(real_authors, pa.string()),
+                                     join_strings(take(first, rng.integers(0, len(first), extra)), take(last, rng.integers(0, len(last), extra)))])
+    author = pa.table({'author_id': np.arange(1, n_authors + 1), 'author_name': author_names})
+
+    base_publishers = vocabulary['publisher_names']
+    publisher_index = np.arange(n_publishers)
+    cycle = publisher_index // len(base_publishers)
+    suffix = pc.if_else(pa.array(cycle > 0), pc.cast(pa.array(cycle), pa.string()), pa.nulls(n_publishers, pa.string()))
+    publisher = pa.table({'publisher_id': np.arange(1, n_publishers + 1),
+                          'publisher_name': join_strings(take(base_publishers, publisher_index % len(base_publishers)), suffix)})
+
+    # Judul 1-6 kata, kata diambil sesuai frekuensinya di judul asli
+    words = vocabulary['title_words']
+    word_cdf = np.cumsum(words.to_numpy(dtype=float))
+    word_cdf /= word_cdf[-1]
+    word_count = np.minimum(1 + rng.poisson(2.5, n_books), 6)
+    title_parts = [pc.if_else(pa.array(word_count > i), take(words.index.to_numpy(), sample_cdf(rng, word_cdf, n_books)), pa.nulls(n_books, pa.string()))
+                   for i in range(6)]
+    languages = vocabulary['book_language']['language_id'].to_numpy()
+    # Sebagian besar buku berbahasa Inggris (id 1-2), sisanya miring ke bahasa yang lebih umum
+    language_cdf = zipf_cdf(len(languages), 2.0)
+    publication_days = rng.beta(5, 1.5, n_books) * (pd.Timestamp('2020-12-31') - pd.Timestamp('1900-01-01')).days
+    publication_seconds = (pd.Timestamp('1900-01-01').value // 10**9) + publication_days.astype(np.int64) * 86400
+    book = pa.table({
+        'book_id': np.arange(1, n_books + 1),
+        'title': join_strings(*title_parts),
+        'isbn13': pc.cast(pa.array(rng.integers(978_000_000_000_0, 979_999_999_999_9, n_books)), pa.string()),
+        'language_id': languages[sample_cdf(rng, language_cdf, n_books)],
+        'num_pages': np.clip(rng.lognormal(5.6, 0.5, n_books), 20, 2000).astype(np.int64),
+        'publication_date': to_timestamps(publication_seconds),
+        'publisher_id': 1 + sample_cdf(rng, zipf_cdf(n_publishers, PUBLISHER_SKEW, rng), n_books),
+    })
+
+    authors_per_book = rng.geometric(1 / AUTHORS_PER_BOOK, n_books)
+    book_author = pd.DataFrame({
+        'book_id': np.repeat(np.arange(1, n_books + 1), authors_per_book),
+        'author_id': 1 + sample_cdf(rng, zipf_cdf(n_authors, AUTHOR_SKEW, rng), int(authors_per_book.sum())),
+    }).drop_duplicates().sort_values(['book_id', 'author_id'], ignore_index=True)
+    return {'author': author, 'publisher': publisher, 'book': book, 'book_author': pa.Table.from_pandas(book_author, preserve_index=False)}
+
+
+def generate_customers(scale, rng, vocabulary):
+    """Alamat (negara miring Zipf), pelanggan dan customer_address."""
+    n_addresses, n_customers = scaled_rows('address', scale), scaled_rows('customer', scale)
+    country_ids = vocabulary['country']['country_id'].to_numpy()
+    address = pa.table({
+        'address_id': np.arange(1, n_addresses + 1),
+        'street_number': pc.cast(pa.array(rng.integers(1, 10000, n_addresses)), pa.string()),
+        'street_name': take(vocabulary['street_names'], rng.integers(0, len(vocabulary['street_names']), n_addresses)),
+        'city': take(vocabulary['cities'], rng.integers(0, len(vocabulary['cities']), n_addresses)),
+        'country_id': country_ids[sample_cdf(rng, zipf_cdf(len(country_ids), COUNTRY_SKEW, rng), n_addresses)],
+    })
+
+    first = take(vocabulary['first_names'], rng.integers(0, len(vocabulary['first_names']), n_customers))
+    last = take(vocabulary['last_names'], rng.integers(0, len(vocabulary['last_names']), n_customers))
+    customer_ids = np.arange(1, n_customers + 1)
+    local_part = pc.utf8_lower(join_strings(pc.utf8_slice_codeunits(first, 0, 1), last, pc.cast(pa.array(customer_ids), pa.string()), sep=''))
+    email = join_strings(local_part, take(vocabulary['email_domains'], rng.integers(0, len(vocabulary['email_domains']), n_customers)), sep='@')
+    customer = pa.table({'customer_id': customer_ids, 'first_name': first, 'last_name': last, 'email': email})
+
+    # Seperti skrip 10: satu alamat aktif per pelanggan, lalu alamat aktif kedua (37,5%), tidak aktif (20%) dan aktif tambahan (10%)
+    parts = [pd.DataFrame({'customer_id': customer_ids, 'address_id': rng.integers(1, n_addresses + 1, n_customers), 'status_id': 1})]
+    for share, status in [(0.375, 1), (0.20, 2), (0.10, 1)]:
+        count = int(n_customers * share)
+        parts.append(pd.DataFrame({'customer_id': rng.choice(customer_ids, count, replace=False),
+                                   'address_id': rng.integers(1, n_addresses + 1, count), 'status_id': status}))
+    customer_address = pd.concat(parts).drop_duplicates(['customer_id', 'address_id']).sort_values(['customer_id', 'address_id'], ignore_index=True)
+    return {'address': address, 'customer': customer, 'customer_address': pa.Table.from_pandas(customer_address, preserve_index=False)}
+
+
+def order_date_cdf(years=ORDER_YEARS):
+    """(hari pertama dalam detik epoch, CDF per hari) dengan tren pertumbuhan, musiman akhir tahun dan akhir pekan."""
+    days = pd.date_range(end=pd.Timestamp(REFERENCE_DATE) - pd.Timedelta(days=1), periods=365 * years, freq='D')
+    age_years = (days[-1] - days).days.to_numpy() / 365.0
+    weights = (1 + ANNUAL_GROWTH) ** -age_years
+    weights *= 1 + 0.6 * np.exp(-((days.dayofyear.to_numpy() - 350) / 20.0) ** 2)
+    weights *= np.where(days.dayofweek.to_numpy() >= 5, 1.25, 1.0)
+    cdf = np.cumsum(weights)
+    return days[0].value // 10**9, cdf / cdf[-1]
+
+
+def iter_order_chunks(scale, rng, customer_address, n_books, chunk_size=ORDER_CHUNK_SIZE):
+    """Membuat cust_order, order_line dan order_history per chunk pesanan (id berlanjut antar chunk)."""
+    n_orders = scaled_rows('cust_order', scale)
+    # Alamat tujuan = alamat pertama pelanggan; aktivitas pelanggan miring (lognormal)
+    first_address = customer_address.drop_duplicates('customer_id')
+    customer_ids = first_address['customer_id'].to_numpy()
+    dest_addresses = first_address['address_id'].to_numpy()
+    activity = np.cumsum(rng.lognormal(0, 1.0, len(customer_ids)))
+    activity /= activity[-1]
+    book_cdf = zipf_cdf(n_books, BOOK_POPULARITY_SKEW, rng)
+    list_price = np.round(rng.uniform(2, 20, n_books), 2)
+    first_day_seconds, day_cdf = order_date_cdf()
+    shipping_cdf = np.cumsum(SHIPPING_METHOD_SHARE)
+    next_line_id, next_history_id = 1, 1
+
+    for start in range(0, n_orders, chunk_size):
+        count = min(chunk_size, n_orders - start)
+        order_ids = np.arange(start + 1, start + count + 1)
+        picked = sample_cdf(rng, activity, count)
+        order_seconds = first_day_seconds + sample_cdf(rng, day_cdf, count) * 86400 + rng.integers(0, 86400, count)
+        cust_order = pa.table({
+            'order_id': order_ids,
+            'order_date': to_timestamps(order_seconds),
+            'customer_id': customer_ids[picked],
+            'shipping_method_id': 1 + sample_cdf(rng, shipping_cdf, count),
+            'dest_address_id': dest_addresses[picked],
+        })
+
+        lines_per_order = rng.geometric(1 / LINES_PER_ORDER, count)
+        line_count = int(lines_per_order.sum())
+        books = sample_cdf(rng, book_cdf, line_count)
+        order_line = pa.table({
+            'line_id': np.arange(next_line_id, next_line_id + line_count),
+            'order_id': np.repeat(order_ids, lines_per_order),
+            'book_id': books + 1,
+            'price': np.round(list_price[books] * rng.uniform(0.7, 1.0, line_count), 2),
+        })
+        next_line_id += line_count
+
+        # Status berurutan 1..k (Received, Pending, In Progress, Delivered) + sebagian dibatalkan (5) atau dikembalikan (6)
+        u = rng.random(count)
+        steps = 1 + (u < 0.90).astype(np.int64) + (u < 0.53) + (u < 0.46)
+        terminal = np.where((steps == 4) & (rng.random(count) < 0.04), 6, np.where((steps < 4) & (rng.random(count) < 0.05), 5, 0))
+        history_count = steps + (terminal > 0)
+        row_order = np.repeat(np.arange(count), history_count)
+        position = np.arange(len(row_order)) - np.repeat(np.cumsum(history_count) - history_count, history_count)
+        status = np.where(position < np.repeat(steps, history_count), position + 1, np.repeat(terminal, history_count))
+        max_delay = np.array([0, 12 * 3600, 2 * 86400, 2 * 86400, 6 * 86400, 3 * 86400, 14 * 86400])
+        delay = (rng.random(len(status)) * max_delay[status]).astype(np.int64)
+        cumulative = np.cumsum(delay)
+        group_start = np.repeat(np.cumsum(history_count) - history_count, history_count)
+        delay_in_group = cumulative - (cumulative[group_start] - delay[group_start])
+        order_history = pa.table({
+            'history_id': np.arange(next_history_id, next_history_id + len(status)),
+            'order_id': order_ids[row_order],
+            'status_id': status,
+            'status_date': to_timestamps(order_seconds[row_order] + delay_in_group),
+        })
+        next_history_id += len(status)
+        yield {'cust_order': cust_order, 'order_line': order_line, 'order_history': order_history}
+
+
+def iter_tables(scale, seed=42, chunk_size=ORDER_CHUNK_SIZE):
+    """Menghasilkan (nama tabel, potongan pa.Table) untuk seluruh skema, urut aman terhadap foreign key."""
+    rng = np.random.default_rng(seed)
+    vocabulary = load_vocabulary()
+    catalog = generate_catalog(scale, rng, vocabulary)
+    customers = generate_customers(scale, rng, vocabulary)
+    static = {table: pa.Table.from_pandas(vocabulary[table], preserve_index=False)
+              for table in ['country', 'book_language', 'shipping_method', 'address_status', 'order_status']}
+    for table in TABLE_ORDER:
+        for source in (catalog, customers, static):
+            if table in source:
+                yield table, source[table]
+    customer_address = customers['customer_address'].to_pandas()
+    for chunk in iter_order_chunks(scale, rng, customer_address, catalog['book'].num_rows, chunk_size):
+        for table in ['cust_order', 'order_line', 'order_history']:
+            yield table, chunk[table]
+
+
+def date_columns():
+    """Kolom bertipe DATE (bukan DATETIME) per tabel menurut 01_mysql_create.sql."""
+    connection = sqlite3.connect(':memory:')
+    try:
+        connection.executescript(mysql_to_sqlite(read_source_script('01')))
+        tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {table: {row[1] for row in connection.execute(f'PRAGMA table_info({table})') if row[2].upper() == 'DATE'} for table in tables}
+    finally:
+        connection.close()
+
+
+def _text_frame(table, dates=()):
+    """pa.Table -> DataFrame teks untuk TSV/SQLite; timestamp diformat di Arrow (jauh lebih cepat dari strftime pandas)."""
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_timestamp(column.type):
+            column = pc.strftime(pc.cast(column, pa.timestamp('s')), format='%Y-%m-%d' if name in dates else '%Y-%m-%d %H:%M:%S')
+        columns[name] = column
+    return pa.table(columns).to_pandas()
+
+
+def write_dataset(output, output_format, scale, seed=42, chunk_size=ORDER_CHUNK_SIZE):
+    """Menulis seluruh tabel ke Parquet (<output>/<tabel>.parquet), TSV + load_data.sql, atau database SQLite."""
+    writers, row_counts = {}, {}
+    dates = date_columns()
+    connection = None
+    if output_format == 'sqlite':
+        if os.path.exists(output):
+            os.remove(output)
+        connection = sqlite3.connect(output)
+        connection.executescript(mysql_to_sqlite(read_source_script('01')))
+    else:
+        os.makedirs(output, exist_ok=True)
+    try:
+        for table, data in iter_tables(scale, seed, chunk_size):
+            first_chunk = table not in row_counts
+            row_counts[table] = row_counts.get(table, 0) + data.num_rows
+            if output_format == 'parquet':
+                # Satu chunk = satu row group, seperti Bronze hasil ekstraksi streaming
+                if first_chunk:
+                    writers[table] = pq.ParquetWriter(os.path.join(output, f'{table}.parquet'), data.schema)
+                writers[table].write_table(data)
+            elif output_format == 'tsv':
+                write_tsv(_text_frame(data, dates[table]), os.path.join(output, f'{table}.tsv'), mode='w' if first_chunk else 'a')
+            else:
+                _text_frame(data, dates[table]).to_sql(table, connection, if_exists='append', index=False, chunksize=100_000)
+    finally:
+        for writer in writers.values():
+            writer.close()
+        if connection is not None:
+            connection.commit()
+            connection.close()
+    if output_format == 'tsv':
+        write_load_script(output, row_counts)
+    return row_counts
+
+
+def write_load_script(output, tables):
+    """Skrip LOAD DATA LOCAL INFILE untuk memuat file TSV ke database gravity_books (MySQL)."""
+    with open(os.path.join(output, 'load_data.sql'), 'w', encoding='utf-8') as f:
+        f.write('USE gravity_books;\nSET FOREIGN_KEY_CHECKS = 0;\nSET UNIQUE_CHECKS = 0;\n')
+        for table in TABLE_ORDER:
+            if table in tables:
+                path = os.path.abspath(os.path.join(output, f'{table}.tsv')).replace('\\', '/')
+                f.write(f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} CHARACTER SET utf8mb4 "
+                        "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n';\n")
+        f.write('SET UNIQUE_CHECKS = 1;\nSET FOREIGN_KEY_CHECKS = 1;\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generator data sintetis gravity_books dengan scale factor.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Scale factor (1 = ukuran dataset asli, mis. 10, 100, 1000).')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='parquet', help='parquet = <tabel>.parquet, tsv = file bulk-load + load_data.sql, sqlite = satu file database.')
+    parser.add_argument('--output', required=True, help='Folder keluaran (parquet/tsv) atau path file database (sqlite).')
+    parser.add_argument('--seed', type=int, default=42, help='Seed generator acak.')
+    parser.add_argument('--chunk-size', type=int, default=ORDER_CHUNK_SIZE, help='Jumlah pesanan per chunk.')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    print(f"Membuat data gravity_books scale factor {args.scale:g} ({args.format}) ke {args.output}...")
+    counts = write_dataset(args.output, args.format, args.scale, seed=args.seed, chunk_size=args.chunk_size)
+    for table, rows in counts.items():
+        print(f"  - {table}: {rows:,} baris")
+    print(f"\nGenerator selesai dalam {time.time() - start_time:.2f} detik.")
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+# 'load_data'  : tulis TSV sementara lalu LOAD DATA LOCAL INFILE (fallback ke executemany jika ditolak server/klien)
+# 'executemany': INSERT multi-baris dalam batch besar
+# 'to_sql'     : jalur lama DataFrame.to_sql(chunksize=1000), dipertahankan untuk perbandingan
+LOAD_METHODS = ('load_data', 'executemany', 'to_sql')
+DEFAULT_BATCH_SIZE = 50_000
+
+
+def _to_tsv_column(series):
+    """Mengubah satu kolom menjadi teks format LOAD DATA default (escape backslash, NULL = \\N)."""
+    null_mask = series.isna()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_bool_dtype(series):
+        values = series.astype(int).astype(str)
+    elif pd.api.types.is_numeric_dtype(series):
+        values = series.astype(str)
+    else:
+        values = (series.astype(str)
+                  .str.replace('\\', '\\\\', regex=False)
+                  .str.replace('\t', '\\t', regex=False)
+                  .str.replace('\n', '\\n', regex=False)
+                  .str.replace('\r', '\\r', regex=False))
+    return values.mask(null_mask, '\\N')
+
+
+def write_tsv(df, path, batch_size=DEFAULT_BATCH_SIZE, mode='w'):
+    """Menulis DataFrame ke file TSV per batch sehingga teks yang dibentuk tidak pernah sebesar tabel utuh (mode='a' untuk menambah)."""
+    with open(path, mode, encoding='utf-8', newline='\n') as f:
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            columns = [_to_tsv_column(batch[column]) for column in batch.columns]
+            lines = columns[0].str.cat(columns[1:], sep='\t') if len(columns) > 1 else columns[0]
+            f.write('\n'.join(lines))
+            f.write('\n')
+
+
+def _decimals_as_text(df):
+    """Kolom desimal Arrow (uang dari etl_common.schema) sebagai teks eksak; MySQL dan SQLite mengonversinya sendiri."""
+    decimal_columns = [column for column in df.columns
+                       if isinstance(df[column].dtype, pd.ArrowDtype) and pa.types.is_decimal(df[column].dtype.pyarrow_dtype)]
+    if not decimal_columns:
+        return df
+    return df.assign(**{column: df[column].astype(str).astype(object).where(df[column].notna(), None) for column in decimal_columns})
+
+
+def _records(df):
+    """Baris DataFrame sebagai dict bertipe Python native (NaN -> None) untuk executemany."""
+    df = _decimals_as_text(df)
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            # datetime64[us] -> objek datetime Python (driver MySQL tidak mengenal pd.Timestamp)
+            df[column] = pd.Series(df[column].to_numpy().astype('datetime64[us]').astype(object), index=df.index, dtype=object)
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+def _load_data_infile(df, table_name, connection, batch_size):
+    """LOAD DATA LOCAL INFILE dari file TSV sementara."""
+    fd, path = tempfile.mkstemp(prefix=f'{table_name}_', suffix='.tsv')
+    os.close(fd)
+    try:
+        write_tsv(df, path, batch_size)
+        columns = ', '.join(f'`{column}`' for column in df.columns)
+        escaped_path = path.replace('\\', '\\\\').replace("'", "\\'")
+        connection.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{escaped_path}' INTO TABLE `{table_name}` CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({columns})"
+        )
+    finally:
+        os.remove(path)
+
+
+def _executemany(df, table_name, connection, batch_size):
+    """INSERT multi-baris per batch (driver menggabungkan executemany menjadi satu statement per batch)."""
+    columns = list(df.columns)
+    stmt = text(f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(':' + column for column in columns)})")
+    for start in range(0, len(df), batch_size):
+        connection.execute(stmt, _records(df.iloc[start:start + batch_size]))
+
+
+def update_rows_by_key(df, table_name, engine, key_column, batch_size=DEFAULT_BATCH_SIZE):
+    """UPDATE per baris berdasarkan satu kolom kunci (biasanya surrogate key) dengan executemany per batch."""
+    columns = [column for column in df.columns if column != key_column]
+    if len(df) == 0 or not columns:
+        return 0
+    stmt = text(f"UPDATE {table_name} SET {', '.join(f'{column} = :{column}' for column in columns)} WHERE {key_column} = :{key_column}")
+    with engine.begin() as connection:
+        for start in range(0, len(df), batch_size):
+            connection.execute(stmt, _records(df.iloc[start:start + batch_size]))
+    return len(df)
+
+
+def get_droppable_indexes(connection, table_name):
+    """Indeks sekunder non-unik (MySQL) yang aman di-drop selama load; indeks milik foreign key dilewati."""
+    fk_columns = {row[0] for row in connection.execute(text(
+        "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND REFERENCED_TABLE_NAME IS NOT NULL"
+    ), {'table': table_name})}
+    rows = connection.execute(text(
+        "SELECT INDEX_NAME, COLUMN_NAME, SUB_PART FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME <> 'PRIMARY' "
+        "AND NON_UNIQUE = 1 AND INDEX_TYPE = 'BTREE' ORDER BY INDEX_NAME, SEQ_IN_INDEX"
+    ), {'table': table_name}).fetchall()
+    indexes = {}
+    for index_name, column_name, sub_part in rows:
+        indexes.setdefault(index_name, []).append(f'`{column_name}`' + (f'({sub_part})' if sub_part else ''))
+    return {name: columns for name, columns in indexes.items() if columns[0].split('(')[0].strip('`') not in fk_columns}
+
+
+def bulk_load_dataframe(df, table_name, engine, method='load_data', batch_size=DEFAULT_BATCH_SIZE, rebuild_indexes=False,
+                        after_insert=None):
+    """Memuat DataFrame ke tabel DWH dengan metode bulk yang dipilih dan melaporkan baris/detik.
+
+    rebuild_indexes=True (khusus MySQL) men-drop indeks sekunder sebelum load lalu membangunnya
+    kembali sekaligus dalam satu ALTER TABLE, yang jauh lebih murah daripada memelihara indeks per baris.
+    `after_insert(connection)` dijalankan di transaksi yang sama dengan insert (mis. menyimpan
+    watermark), sehingga keduanya ter-commit bersama atau tidak sama sekali.
+    Mengembalikan statistik {'rows', 'seconds', 'rows_per_second', 'method'}.
+    """
+    if method not in LOAD_METHODS:
+        raise ValueError(f"Metode load tidak dikenal: {method} (pilihan: {', '.join(LOAD_METHODS)})")
+    start = time.perf_counter()
+    used_method = method
+    dropped_indexes = {}
+    if method == 'to_sql':
+        with engine.begin() as connection:
+            _decimals_as_text(df).to_sql(table_name, connection, if_exists='append', index=False, chunksize=1000)
+            if after_insert is not None:
+                after_insert(connection)
+    elif len(df) == 0:
+        if after_insert is not None:
+            with engine.begin() as connection:
+                after_insert(connection)
+    else:
+        is_mysql = engine.dialect.name == 'mysql'
+        with engine.begin() as connection:
+            if rebuild_indexes and is_mysql:
+                dropped_indexes = get_droppable_indexes(connection, table_name)
+                if dropped_indexes:
+                    connection.exec_driver_sql(f"ALTER TABLE `{table_name}` " + ', '.join(f'DROP INDEX `{name}`' for name in dropped_indexes))
+        try:
+            if method == 'load_data' and is_mysql:
+                try:
+                    with engine.begin() as connection:
+                        _load_data_infile(df, table_name, connection, batch_size)
+                        if after_insert is not None:
+                            after_insert(connection)
+                except DBAPIError as e:
+                    print(f"  - Peringatan: LOAD DATA LOCAL INFILE ditolak untuk {table_name} ({e.orig}), beralih ke executemany.")
+                    used_method = 'executemany'
+            else:
+                used_method = 'executemany'
+            if used_method == 'executemany':
+                with engine.begin() as connection:
+                    _executemany(df, table_name, connection, batch_size)
+                    if after_insert is not None:
+                        after_insert(connection)
+        finally:
+            if dropped_indexes:
+                with engine.begin() as connection:
+                    connection.exec_driver_sql(f"ALTER TABLE `{table_name}` " + ', '.join(
+                        f"ADD INDEX `{name}` ({', '.join(columns)})" for name, columns in dropped_indexes.items()))
+    seconds = time.perf_counter() - start
+    rows_per_second = len(df) / seconds if seconds > 0 else float('inf')
+    index_note = f", {len(dropped_indexes)} indeks dibangun ulang" if dropped_indexes else ''
+    print(f"  - {table_name}: {len(df)} baris dimuat via {used_method} dalam {seconds:.2f} detik ({rows_per_second:,.0f} baris/detik{index_note}).")
+    return {'rows': len(df), 'seconds': seconds, 'rows_per_second': rows_per_second, 'method': used_method}
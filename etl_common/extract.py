@@ -0,0 +1,163 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import MetaData, Table, select, tuple_, types
+
+
+def arrow_type_for(sql_type):
+    """Memetakan tipe kolom SQLAlchemy ke tipe Arrow (sama dengan hasil read_sql_table + to_parquet)."""
+    if isinstance(sql_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, types.Integer):
+        return pa.int64()
+    if isinstance(sql_type, (types.Numeric, types.Float)):
+        # read_sql (coerce_float=True) selalu menghasilkan float untuk DECIMAL
+        return pa.float64()
+    if isinstance(sql_type, (types.DateTime, types.Date)):
+        # read_sql_table mengubah kolom DATE/DATETIME menjadi datetime64[ns]
+        return pa.timestamp('ns')
+    if isinstance(sql_type, types.String):
+        return pa.string()
+    return None
+
+
+def reflect_table(engine, table_name):
+    """Membaca definisi tabel sumber dan skema Arrow-nya (None jika ada tipe yang tidak dikenal)."""
+    table = Table(table_name, MetaData(), autoload_with=engine)
+    fields = [(column.name, arrow_type_for(column.type)) for column in table.columns]
+    if any(arrow_type is None for _, arrow_type in fields):
+        return table, None
+    return table, pa.schema(fields)
+
+
+def iter_table_chunks(engine, table, chunk_size, start_after=None, stop_at=None):
+    """Membaca tabel per chunk dengan keyset pagination pada primary key.
+
+    Setiap chunk adalah kueri `WHERE pk > <kunci terakhir> ORDER BY pk LIMIT chunk_size`
+    sehingga memori di sisi klien dan server tetap rata, terlepas dari ukuran tabel dan
+    driver yang dipakai (mysqlconnector tidak mendukung server-side cursor di SQLAlchemy).
+    `start_after` berisi nilai primary key awal, misalnya high-water mark ekstraksi inkremental;
+    `stop_at` (inklusif) membatasi baca sampai primary key yang dicatat sebelum ekstraksi dimulai.
+    """
+    pk_columns = list(table.primary_key.columns)
+    date_columns = [column.name for column in table.columns if isinstance(column.type, (types.DateTime, types.Date))]
+    with engine.connect() as connection:
+        if not pk_columns:
+            # Tanpa primary key tidak ada urutan stabil untuk keyset, baca dengan chunksize biasa
+            yield from pd.read_sql_query(select(table), connection.execution_options(stream_results=True), chunksize=chunk_size, parse_dates=date_columns)
+            return
+        pk_names = [column.name for column in pk_columns]
+        last_key = list(start_after) if start_after is not None else None
+        while True:
+            stmt = select(table)
+            if last_key is not None:
+                stmt = stmt.where(tuple_(*pk_columns) > tuple_(*last_key))
+            if stop_at is not None:
+                stmt = stmt.where(tuple_(*pk_columns) <= tuple_(*stop_at))
+            stmt = stmt.order_by(*pk_columns).limit(chunk_size)
+            chunk = pd.read_sql_query(stmt, connection, parse_dates=date_columns)
+            if chunk.empty:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            # to_dict mengembalikan tipe Python native (bukan numpy) agar bisa di-bind oleh semua driver
+            last_key = list(chunk[pk_names].iloc[-1:].to_dict('records')[0].values())
+
+
+def stream_table_to_parquet(engine, table_name, path, chunk_size, filesystem=None, start_after=None, write_empty=True):
+    """Menyalin satu tabel sumber ke file Parquet sebagai rangkaian row group berukuran chunk_size.
+
+    Mengembalikan statistik {'rows', 'max_key', 'read_seconds', 'write_seconds'}. File tidak
+    dibuat jika tidak ada baris dan write_empty=False (dipakai oleh ekstraksi inkremental).
+    """
+    table, schema = reflect_table(engine, table_name)
+    pk_names = [column.name for column in table.primary_key.columns]
+    stats = {'rows': 0, 'max_key': None, 'read_seconds': 0.0, 'write_seconds': 0.0}
+    sink = None
+    writer = None
+    chunks = iter_table_chunks(engine, table, chunk_size, start_after=start_after)
+    try:
+        while True:
+            read_start = time.perf_counter()
+            chunk = next(chunks, None)
+            stats['read_seconds'] += time.perf_counter() - read_start
+            if chunk is None:
+                break
+            write_start = time.perf_counter()
+            batch = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False, safe=False)
+            if writer is None:
+                sink = filesystem.open(path, 'wb') if filesystem is not None else open(path, 'wb')
+                writer = pq.ParquetWriter(sink, batch.schema)
+            writer.write_table(batch, row_group_size=chunk_size)
+            stats['write_seconds'] += time.perf_counter() - write_start
+            stats['rows'] += len(chunk)
+            if len(pk_names) == 1:
+                stats['max_key'] = chunk[pk_names[0]].max().item()
+        if writer is None and write_empty and schema is not None:
+            sink = filesystem.open(path, 'wb') if filesystem is not None else open(path, 'wb')
+            writer = pq.ParquetWriter(sink, schema)
+    finally:
+        write_start = time.perf_counter()
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            # Untuk S3, close() mengunggah part multipart terakhir
+            sink.close()
+        stats['write_seconds'] += time.perf_counter() - write_start
+    return stats
+
+
+def run_tables_in_parallel(tables, extract_fn, workers):
+    """Menjalankan extract_fn(table) untuk setiap tabel pada thread pool berukuran `workers`.
+
+    extract_fn mengembalikan (hasil, keterangan). Keterangan dan durasi setiap tabel dicetak
+    begitu tabel tersebut selesai, lalu ringkasan total waktu per tabel vs wall-clock.
+    Mengembalikan {tabel: hasil} dengan urutan sama seperti `tables`.
+    """
+    def timed(table):
+        start = time.perf_counter()
+        result, message = extract_fn(table)
+        return result, message, time.perf_counter() - start
+
+    results = {}
+    elapsed_per_table = {}
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(timed, table): table for table in tables}
+        for future in as_completed(futures):
+            table = futures[future]
+            result, message, elapsed = future.result()
+            results[table] = result
+            elapsed_per_table[table] = elapsed
+            print(f"  - {message} [{elapsed:.2f} detik]")
+    wall_seconds = time.perf_counter() - wall_start
+    total_seconds = sum(elapsed_per_table.values())
+    speedup = total_seconds / wall_seconds if wall_seconds > 0 else 1.0
+    print(f"  Total waktu per tabel {total_seconds:.2f} detik, wall-clock {wall_seconds:.2f} detik "
+          f"({workers} worker, speedup {speedup:.1f}x).")
+    return {table: results[table] for table in tables}
+
+
+def read_table_as_arrow(engine, table_name, chunk_size, start_after=None, stop_at=None):
+    """Membaca satu tabel sumber per chunk lalu menggabungkannya menjadi satu Arrow Table.
+
+    Skema Arrow sama dengan hasil stream_table_to_parquet, sehingga tabel ini bisa langsung
+    ditulis sebagai file Bronze.
+    """
+    table, schema = reflect_table(engine, table_name)
+    batches = [pa.Table.from_pandas(chunk, schema=schema, preserve_index=False, safe=False)
+               for chunk in iter_table_chunks(engine, table, chunk_size, start_after=start_after, stop_at=stop_at)]
+    if not batches:
+        if schema is not None:
+            return schema.empty_table()
+        return pa.Table.from_pandas(pd.read_sql_query(select(table).limit(0), engine), preserve_index=False)
+    return pa.concat_tables(batches, promote_options='default')
+
+
+def read_table_in_chunks(engine, table_name, chunk_size, start_after=None, stop_at=None):
+    """Membaca satu tabel sumber per chunk ke Arrow lalu menggabungkannya menjadi satu DataFrame."""
+    return read_table_as_arrow(engine, table_name, chunk_size, start_after=start_after, stop_at=stop_at).to_pandas(self_destruct=True)
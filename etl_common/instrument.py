@@ -0,0 +1,103 @@
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+# Interval sampler RSS cadangan jika /proc/self/clear_refs tidak bisa dipakai untuk mereset puncak RSS
+RSS_SAMPLE_SECONDS = 0.02
+
+
+def _read_proc_status(field):
+    """Nilai (byte) sebuah field kB di /proc/self/status, None jika tidak tersedia (mis. bukan Linux)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def read_io_counters():
+    """Byte yang dibaca/ditulis proses sejauh ini (rchar/wchar: file, socket dan pipe), kosong jika tidak tersedia."""
+    counters = {}
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                name, value = line.split(':')
+                counters[name] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+def _reset_peak_rss():
+    """Mereset VmHWM (puncak RSS) proses; False jika kernel/izin tidak mendukung."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _start_rss_sampler():
+    """Memulai thread yang mencatat RSS maksimum; mengembalikan fungsi stop() -> puncak RSS (byte)."""
+    state = {'peak': _read_proc_status('VmRSS') or 0}
+    stop_event = threading.Event()
+
+    def sample():
+        while not stop_event.wait(RSS_SAMPLE_SECONDS):
+            state['peak'] = max(state['peak'], _read_proc_status('VmRSS') or 0)
+
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+
+    def stop():
+        stop_event.set()
+        thread.join()
+        return max(state['peak'], _read_proc_status('VmRSS') or 0)
+
+    return stop
+
+
+@contextmanager
+def measure_stage(results, stage, **info):
+    """Mengukur satu stage pipeline dan menambahkan catatannya ke `results`.
+
+    Dicatat: wall time, CPU time proses (semua thread), puncak RSS selama stage, serta byte
+    I/O proses. Blok `with` menerima dict catatan sehingga pemanggil dapat menambahkan
+    metrik logis seperti rows_read/rows_written/bytes_read/bytes_written.
+    """
+    record = {'stage': stage, **info}
+    stop_sampler = None if _reset_peak_rss() else _start_rss_sampler()
+    io_start = read_io_counters()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['wall_seconds'] = time.perf_counter() - wall_start
+        record['cpu_seconds'] = time.process_time() - cpu_start
+        peak_rss = stop_sampler() if stop_sampler else _read_proc_status('VmHWM')
+        if peak_rss is None:
+            # Tanpa /proc: puncak sepanjang umur proses (ru_maxrss dalam kB di Linux)
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        record['peak_rss_bytes'] = peak_rss
+        io_end = read_io_counters()
+        if io_start and io_end:
+            record['io_read_bytes'] = io_end['rchar'] - io_start['rchar']
+            record['io_write_bytes'] = io_end['wchar'] - io_start['wchar']
+        results.append(record)
+        print(f"  [bench] {stage}: {record['wall_seconds']:.3f} detik wall, {record['cpu_seconds']:.3f} detik CPU, "
+              f"puncak RSS {peak_rss / 1024**2:.1f} MB")
+
+
+def directory_stats(fs, path):
+    """(jumlah file, total byte) di bawah sebuah path fsspec; (0, 0) jika belum ada."""
+    if not fs.exists(path):
+        return 0, 0
+    sizes = fs.du(path, total=False) if fs.isdir(path) else {path: fs.size(path)}
+    return len(sizes), int(sum(sizes.values()))
+
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Lookup dense (array berindeks natural id - offset) dipakai selama rentang id tidak jauh lebih besar dari jumlah kunci
+DENSE_SPAN_FACTOR = 16
+DENSE_MIN_SPAN = 1_000_000
+
+
+def fetch_key_pairs(engine, table_name, sk_column, natural_column, where=None):
+    """Mengambil hanya proyeksi (surrogate key, natural key) sebuah dimensi sebagai array NumPy."""
+    sql = f'SELECT {sk_column}, {natural_column} FROM {table_name}'
+    if where:
+        sql += f' WHERE {where}'
+    pairs = pd.read_sql_query(text(sql), engine)
+    return pairs[natural_column].to_numpy(), pairs[sk_column].to_numpy()
+
+
+def build_key_lookup(natural_ids, surrogate_keys):
+    """Membangun lookup natural id -> surrogate key.
+
+    Kunci disimpan terurut (stabil, sehingga natural id ganda tetap dalam urutan aslinya). Jika
+    natural id unik dan rentangnya rapat, dibuat juga array dense berisi SK (-1 = tidak ada)
+    sehingga pencarian cukup satu gather array.
+    """
+    natural_ids = np.asarray(natural_ids, dtype=np.int64)
+    surrogate_keys = np.asarray(surrogate_keys, dtype=np.int64)
+    order = np.argsort(natural_ids, kind='stable')
+    keys = natural_ids[order]
+    lookup = {'keys': keys, 'values': surrogate_keys[order], 'unique': bool(len(keys) == 0 or (np.diff(keys) > 0).all())}
+    if lookup['unique'] and len(keys) > 0:
+        span = int(keys[-1] - keys[0]) + 1
+        if span <= DENSE_SPAN_FACTOR * len(keys) + DENSE_MIN_SPAN:
+            dense = np.full(span, -1, dtype=np.int64)
+            dense[keys - keys[0]] = lookup['values']
+            lookup['offset'] = int(keys[0])
+            lookup['dense'] = dense
+    return lookup
+
+
+def gather_keys(lookup, natural_ids):
+    """Mencari surrogate key untuk setiap natural id dengan semantik sama seperti left merge.
+
+    Mengembalikan (row_index, surrogate_keys): row_index memetakan setiap baris hasil ke baris
+    masukan. Untuk natural id unik row_index = arange(n); jika natural id di dimensi ganda,
+    baris masukan diulang sekali per kecocokan, persis seperti pd.merge(how='left').
+    Natural id yang tidak ditemukan (atau null) mendapat SK -1.
+    """
+    natural_ids = pd.Series(natural_ids)
+    valid = natural_ids.notna().to_numpy()
+    ids = np.where(valid, natural_ids.fillna(0).to_numpy(), 0).astype(np.int64)
+    n = len(ids)
+    keys, values = lookup['keys'], lookup['values']
+
+    if 'dense' in lookup:
+        positions = ids - lookup['offset']
+        in_range = valid & (positions >= 0) & (positions < len(lookup['dense']))
+        surrogate_keys = np.full(n, -1, dtype=np.int64)
+        surrogate_keys[in_range] = lookup['dense'][positions[in_range]]
+        return np.arange(n), surrogate_keys
+
+    if len(keys) == 0:
+        return np.arange(n), np.full(n, -1, dtype=np.int64)
+
+    lo = np.searchsorted(keys, ids, side='left')
+    if lookup['unique']:
+        clipped = np.minimum(lo, len(keys) - 1)
+        found = valid & (lo < len(keys)) & (keys[clipped] == ids)
+        return np.arange(n), np.where(found, values[clipped], -1)
+
+    hi = np.searchsorted(keys, ids, side='right')
+    matches = np.where(valid, hi - lo, 0)
+    out_counts = np.maximum(matches, 1)
+    row_index = np.repeat(np.arange(n), out_counts)
+    within = np.arange(len(row_index)) - np.repeat(np.cumsum(out_counts) - out_counts, out_counts)
+    positions = np.minimum(np.repeat(lo, out_counts) + within, len(keys) - 1)
+    has_match = np.repeat(matches > 0, out_counts)
+    return row_index, np.where(has_match, values[positions], -1)
+
+
+def date_to_sk(dates):
+    """Menghitung date_sk (YYYYMMDD) langsung dari kolom tanggal; tanggal null mendapat -1."""
+    dates = pd.to_datetime(pd.Series(dates))
+    date_sk = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    return date_sk.fillna(-1).astype(np.int64).to_numpy()
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+import uuid
+
+# Snapshot layer di lake: setiap publikasi ditulis ke prefix baru <layer>/_v/<versi>/ lalu diaktifkan
+# dengan menimpa satu objek kecil <layer>/_manifest.json. PUT satu objek di S3/MinIO bersifat atomik,
+# sehingga pembaca yang me-resolve path lewat manifest selalu melihat snapshot utuh (lama atau baru),
+# tidak pernah layer yang kosong atau setengah tertulis.
+MANIFEST_NAME = '_manifest.json'
+VERSIONS_DIR = '_v'
+# Jumlah versi yang disimpan; versi sebelumnya tetap ada untuk pembaca yang masih memakai manifest lama
+KEEP_VERSIONS = 2
+# Jumlah objek yang diunggah bersamaan dalam satu sesi s3fs/aiobotocore
+UPLOAD_BATCH_SIZE = 16
+# Ukuran part multipart upload (dan block size s3fs)
+MULTIPART_CHUNK_SIZE = 16 * 1024 * 1024
+# Jumlah part dari satu file yang diunggah bersamaan
+MULTIPART_CONCURRENCY = 4
+
+
+def new_version_id():
+    """ID versi yang terurut menurut waktu (UTC) dan unik antar proses."""
+    return time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()) + '-' + uuid.uuid4().hex[:8]
+
+
+def local_files(local_root, remote_root):
+    """Pasangan (file lokal, path tujuan) untuk semua file di bawah sebuah folder lokal, urut path."""
+    files = []
+    for root, _, names in os.walk(local_root):
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), local_root).replace(os.sep, '/')
+            files.append((os.path.join(root, name), f'{remote_root}/{rel}'))
+    return sorted(files, key=lambda pair: pair[1])
+
+
+def upload_files(fs, files):
+    """Mengunggah [(file lokal, path tujuan), ...] bersamaan.
+
+    Di s3fs semua file dijadwalkan sebagai coroutine di sesi aiobotocore yang sama (UPLOAD_BATCH_SIZE
+    sekaligus) dan file besar dipecah menjadi part MULTIPART_CHUNK_SIZE yang juga diunggah paralel.
+    """
+    if not files:
+        return
+    for remote_dir in sorted({remote.rsplit('/', 1)[0] for _, remote in files}):
+        fs.makedirs(remote_dir, exist_ok=True)
+    if getattr(fs, 'async_impl', False):
+        fs.put([local for local, _ in files], [remote for _, remote in files], batch_size=UPLOAD_BATCH_SIZE,
+               chunksize=MULTIPART_CHUNK_SIZE, max_concurrency=MULTIPART_CONCURRENCY)
+    else:
+        fs.put([local for local, _ in files], [remote for _, remote in files])
+
+
+def read_manifest(fs, layer_root):
+    """Manifest snapshot aktif sebuah layer, atau None jika layer belum pernah dipublikasikan sebagai snapshot."""
+    path = f'{layer_root}/{MANIFEST_NAME}'
+    if not fs.exists(path):
+        return None
+    with fs.open(path, 'r') as f:
+        return json.load(f)
+
+
+def publish_snapshot(fs, layer_root, local_root, metadata=None):
+    """Mengunggah isi `local_root` sebagai versi baru lalu mengaktifkannya lewat manifest.
+
+    Setiap entri tingkat atas menjadi satu tabel di manifest: file <nama>.parquet atau folder
+    dataset berpartisi <nama>/. Mengembalikan manifest yang dipublikasikan.
+    """
+    version = new_version_id()
+    version_prefix = f'{VERSIONS_DIR}/{version}'
+    upload_files(fs, local_files(local_root, f'{layer_root}/{version_prefix}'))
+
+    tables = {}
+    for name in sorted(os.listdir(local_root)):
+        table = name[:-len('.parquet')] if name.endswith('.parquet') else name
+        tables[table] = f'{version_prefix}/{name}'
+    manifest = {'version': version, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'tables': tables}
+    manifest.update(metadata or {})
+    # Pointer swap: satu PUT kecil, atomik bagi pembaca
+    with fs.open(f'{layer_root}/{MANIFEST_NAME}', 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    remove_old_versions(fs, layer_root, keep=KEEP_VERSIONS)
+    return manifest
+
+
+def remove_old_versions(fs, layer_root, keep=KEEP_VERSIONS):
+    """Menghapus versi lama (menyisakan `keep` versi terbaru) dan file layer non-snapshot dari format lama."""
+    versions_root = f'{layer_root}/{VERSIONS_DIR}'
+    versions = sorted(path.rstrip('/').rsplit('/', 1)[-1] for path in fs.ls(versions_root)) if fs.exists(versions_root) else []
+    removed = 0
+    for version in versions[:-keep] if keep else versions:
+        fs.rm(f'{versions_root}/{version}', recursive=True)
+        removed += 1
+    # Tabel yang dulu ditulis langsung di bawah layer tidak lagi dibaca setelah ada manifest
+    for path in fs.ls(layer_root):
+        name = path.rstrip('/').rsplit('/', 1)[-1]
+        if name not in (VERSIONS_DIR, MANIFEST_NAME):
+            fs.rm(path, recursive=True)
+            removed += 1
+    return removed
+
@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+# Ukuran blok saat meng-hash file
+DIGEST_BLOCK_SIZE = 1024 * 1024
+# Jumlah thread unggahan asinkron ke object storage
+UPLOAD_WORKERS = 4
+
+
+def file_digest(path):
+    """Hash BLAKE2b isi sebuah file (hex)."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(DIGEST_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    """Kunci cache dari bagian-bagian yang bisa di-JSON-kan (nama layer, versi kode, kunci masukan)."""
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode(), digest_size=20).hexdigest()
+
+
+def code_digest(paths):
+    """Hash gabungan file sumber transformasi; kode yang berubah otomatis membuat kunci layer baru."""
+    return cache_key(*[file_digest(path) for path in paths])
+
+
+def new_staging_dir(cache_dir):
+    """Folder sementara di dalam cache (satu filesystem, sehingga store() cukup rename)."""
+    path = os.path.join(cache_dir, '_tmp', uuid.uuid4().hex)
+    os.makedirs(path)
+    return path
+
+
+def lookup(cache_dir, key):
+    """Folder entri untuk `key` atau None; mtime entri diperbarui sebagai penanda LRU."""
+    path = os.path.join(cache_dir, key)
+    if not os.path.isdir(path):
+        return None
+    os.utime(path)
+    return path
+
+
+def store(cache_dir, key, staging_dir):
+    """Memindahkan folder staging menjadi entri `key` secara atomik (entri yang sudah ada dipakai apa adanya)."""
+    path = os.path.join(cache_dir, key)
+    try:
+        os.rename(staging_dir, path)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+        # Entri yang sama sudah ditulis lebih dulu (isi identik karena kuncinya hash konten)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    os.utime(path)
+    return path
+
+
+def directory_size(path):
+    """Total byte semua file di bawah sebuah folder."""
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def evict(cache_dir, max_bytes, keep=()):
+    """Menghapus entri yang paling lama tidak dipakai sampai total cache <= max_bytes.
+
+    Entri di `keep` (dipakai run ini) tidak dihapus. Mengembalikan (jumlah entri dihapus, byte dibebaskan).
+    """
+    if not os.path.isdir(cache_dir):
+        return 0, 0
+    shutil.rmtree(os.path.join(cache_dir, '_tmp'), ignore_errors=True)
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isdir(path) and name != '_tmp':
+            entries.append((os.path.getmtime(path), name, directory_size(path)))
+    total = sum(size for _, _, size in entries)
+    removed, freed = 0, 0
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name in keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+        removed += 1
+        freed += size
+    return removed, freed
+
+
+# --- Unggahan asinkron ---
+# Unggahan ke object storage berjalan di thread pool sendiri sehingga stage berikutnya tidak menunggu.
+# wait_for_uploads() dipanggil di akhir pipeline agar semua data sudah tersimpan sebelum proses selesai.
+_upload_executor = None
+_upload_futures = []
+_upload_lock = threading.Lock()
+
+
+def submit_upload(description, upload_fn, *args):
+    """Menjadwalkan upload_fn(*args) di thread pool unggahan; mengembalikan Future."""
+    global _upload_executor
+    with _upload_lock:
+        if _upload_executor is None:
+            _upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix='upload')
+
+        def timed():
+            start = time.perf_counter()
+            result = upload_fn(*args)
+            print(f"  [upload] {description} selesai [{time.perf_counter() - start:.2f} detik]")
+            return result
+
+        future = _upload_executor.submit(timed)
+        _upload_futures.append((description, future))
+    return future
+
+
+def wait_for_uploads():
+    """Menunggu semua unggahan; jika ada yang gagal, RuntimeError berisi semua error dilempar setelah semuanya selesai."""
+    global _upload_executor
+    with _upload_lock:
+        pending = list(_upload_futures)
+        _upload_futures.clear()
+    errors = []
+    for description, future in pending:
+        try:
+            future.result()
+        except Exception as e:
+            errors.append(f"{description}: {e}")
+    with _upload_lock:
+        if _upload_executor is not None and not _upload_futures:
+            _upload_executor.shutdown()
+            _upload_executor = None
+    if errors:
+        raise RuntimeError(f"{len(errors)} unggahan gagal: " + '; '.join(errors))
+    return len(pending)
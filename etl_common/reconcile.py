@@ -0,0 +1,223 @@
+import hashlib
+from collections import Counter
+
+import pandas as pd
+
+# Rekonsiliasi skema bintang DWH vs Gold di dalam database masing-masing. Setiap baris dirender menjadi
+# teks kanonik (kunci natural, bukan surrogate key yang memang berbeda antar sistem), di-hash MD5, lalu
+# per bucket (misalnya bulan date_sk atau rentang ID) dihitung jumlah baris dan dua jumlah potongan
+# hash 32-bit. Jumlah hash tidak bergantung urutan baris, jadi yang berpindah ke Python hanya satu baris
+# per bucket. Bucket yang berbeda diturunkan ke level yang lebih halus, dan hanya baris di bucket
+# terhalus yang berbeda yang diambil untuk dibandingkan.
+
+# Pemisah kolom dan penanda NULL di teks baris yang di-hash
+FIELD_SEPARATOR = '|'
+NULL_MARKER = '<null>'
+# Jumlah bucket berbeda terbanyak yang diturunkan ke level berikutnya (sisanya hanya dilaporkan)
+MAX_DRILL_BUCKETS = 20
+# Jumlah contoh baris berbeda yang dicetak per tabel
+MAX_EXAMPLE_ROWS = 5
+
+# Potongan SQL per dialek. Teks baris harus identik di semua dialek: integer tanpa desimal, uang dalam
+# sen (integer), tanggal 'YYYY-MM-DD'. MD5 MySQL dihitung atas charset kolom (utf8mb4 = byte UTF-8 seperti DuckDB).
+DIALECTS = {
+    'mysql': {
+        'int': 'CAST({} AS SIGNED)', 'text': 'CAST({} AS CHAR)', 'date': 'CAST(DATE({}) AS CHAR)', 'div': '({} DIV {})',
+        'concat': lambda parts: f"CONCAT({', '.join(parts)})", 'md5': 'MD5({})',
+        'hex32': 'CAST(CONV(SUBSTRING({}, {}, 8), 16, 10) AS SIGNED)', 'sum': 'CAST(SUM({}) AS SIGNED)',
+    },
+    'duckdb': {
+        'int': 'CAST({} AS BIGINT)', 'text': 'CAST({} AS VARCHAR)', 'date': 'CAST(CAST({} AS DATE) AS VARCHAR)', 'div': '({} // {})',
+        'concat': lambda parts: f"concat({', '.join(parts)})", 'md5': 'md5({})',
+        'hex32': "CAST(('0x' || substr({}, {}, 8)) AS BIGINT)", 'sum': 'CAST(SUM({}) AS BIGINT)',
+    },
+    # DWH pengganti di benchmark offline; md5/hex_to_int didaftarkan lewat register_sqlite_functions
+    'sqlite': {
+        'int': 'CAST({} AS INTEGER)', 'text': 'CAST({} AS TEXT)', 'date': 'date({})', 'div': '({} / {})',
+        'concat': lambda parts: ' || '.join(parts), 'md5': 'md5({})',
+        'hex32': 'hex_to_int(substr({}, {}, 8))', 'sum': 'SUM({})',
+    },
+}
+
+# Tabel yang direkonsiliasi: sumber FROM (alias sama di kedua sisi), level bucket (ekspresi, lebar) dari
+# kasar ke halus, dan kolom yang di-hash (ekspresi, jenis: int/money/text/date). Fakta memakai LEFT JOIN
+# ke dimensi agar SK yatim tetap terlihat sebagai kunci natural NULL. Dimensi DWH yang sudah dimuat
+# inkremental (kolom is_current) juga menyimpan versi yang sudah ditutup, sedangkan Gold hanya versi
+# berlaku; untuk tabel itu sisi DWH memakai 'current_source'. Join fakta tetap ke versi yang dirujuknya.
+RECONCILE_TABLES = {
+    'dim_date': {
+        'source': 'dim_date t',
+        'levels': [('t.date_sk', 100), ('t.date_sk', 1)],
+        'columns': [('t.date_sk', 'int'), ('t.full_date', 'date'), ('t.day_val', 'int'), ('t.month_val', 'int'), ('t.year_val', 'int'),
+                    ('t.quarter_val', 'int'), ('t.day_name', 'text'), ('t.month_name', 'text')],
+    },
+    'dim_customer': {
+        'source': 'dim_customer t',
+        'current_source': '(SELECT * FROM dim_customer WHERE is_current = 1) t',
+        'levels': [('t.customer_id', 1000), ('t.customer_id', 1)],
+        'columns': [('t.customer_id', 'int'), ('t.first_name', 'text'), ('t.last_name', 'text'), ('t.email', 'text'),
+                    ('t.address_status', 'text'), ('t.street_number', 'text'), ('t.street_name', 'text'), ('t.city', 'text'), ('t.country', 'text')],
+    },
+    'dim_book': {
+        'source': 'dim_book t',
+        'current_source': '(SELECT * FROM dim_book WHERE is_current = 1) t',
+        'levels': [('t.book_id', 1000), ('t.book_id', 1)],
+        'columns': [('t.book_id', 'int'), ('t.title', 'text'), ('t.isbn13', 'text'), ('t.language_code', 'text'), ('t.language_name', 'text'),
+                    ('t.num_pages', 'int'), ('t.publication_date', 'date'), ('t.publisher_name', 'text'), ('t.author_name', 'text')],
+    },
+    'dim_shipping': {
+        'source': 'dim_shipping t',
+        'current_source': '(SELECT * FROM dim_shipping WHERE is_current = 1) t',
+        'levels': [('t.shipping_method_id', 1)],
+        'columns': [('t.shipping_method_id', 'int'), ('t.shipping_method', 'text')],
+    },
+    'fact_book_sales': {
+        'source': ('fact_book_sales f LEFT JOIN dim_customer c ON c.customer_sk = f.customer_sk LEFT JOIN dim_book b ON b.book_sk = f.book_sk '
+                   'LEFT JOIN dim_shipping s ON s.shipping_sk = f.shipping_sk'),
+        'levels': [('f.date_sk', 100), ('f.date_sk', 1)],
+        'columns': [('f.date_sk', 'int'), ('c.customer_id', 'int'), ('b.book_id', 'int'), ('s.shipping_method_id', 'int'),
+                    ('f.price', 'money'), ('f.shipping_cost', 'money')],
+    },
+}
+
+
+def register_sqlite_functions(dbapi_connection):
+    """Mendaftarkan md5() dan hex_to_int() di koneksi sqlite3 (SQLite tidak punya keduanya)."""
+    dbapi_connection.create_function('md5', 1, lambda value: None if value is None else hashlib.md5(value.encode('utf-8')).hexdigest(),
+                                     deterministic=True)
+    dbapi_connection.create_function('hex_to_int', 1, lambda value: None if value is None else int(value, 16), deterministic=True)
+
+
+def render_column(expression, kind, dialect):
+    """Ekspresi teks kanonik satu kolom (NULL menjadi NULL_MARKER)."""
+    d = DIALECTS[dialect]
+    if kind == 'int':
+        rendered = d['text'].format(d['int'].format(expression))
+    elif kind == 'money':
+        rendered = d['text'].format(d['int'].format(f'ROUND({expression} * 100)'))
+    elif kind == 'date':
+        rendered = d['date'].format(expression)
+    else:
+        rendered = d['text'].format(expression)
+    return f"COALESCE({rendered}, '{NULL_MARKER}')"
+
+
+def row_text_sql(spec, dialect):
+    """Ekspresi teks kanonik satu baris: semua kolom spec dipisah FIELD_SEPARATOR."""
+    parts = []
+    for expression, kind in spec['columns']:
+        if parts:
+            parts.append(f"'{FIELD_SEPARATOR}'")
+        parts.append(render_column(expression, kind, dialect))
+    return DIALECTS[dialect]['concat'](parts)
+
+
+def bucket_expressions(spec, dialect, depth):
+    """Ekspresi kunci bucket level 0..depth."""
+    return [expression if width == 1 else DIALECTS[dialect]['div'].format(expression, width) for expression, width in spec['levels'][:depth + 1]]
+
+
+def bucket_filter(levels, buckets):
+    """WHERE yang membatasi baris ke daftar bucket (tuple nilai per level).
+
+    Bucket ditulis sebagai rentang pada kolom aslinya (kunci bernilai non-negatif), sehingga indeks
+    MySQL dan statistik min/max row group Parquet tetap bisa dipakai; portabel tanpa row constructor.
+    """
+    def condition(expression, width, value):
+        if pd.isna(value):
+            return f'{expression} IS NULL'
+        if width == 1:
+            return f'{expression} = {int(value)}'
+        return f'{expression} >= {int(value) * width} AND {expression} < {(int(value) + 1) * width}'
+    clauses = ['(' + ' AND '.join(condition(expression, width, value) for (expression, width), value in zip(levels, bucket)) + ')' for bucket in buckets]
+    return ' WHERE ' + ' OR '.join(clauses)
+
+
+def bucket_checksum_sql(spec, dialect, depth, buckets=None):
+    """SQL jumlah baris dan checksum per bucket level `depth`, dibatasi ke bucket level sebelumnya jika `buckets` diisi."""
+    d = DIALECTS[dialect]
+    expressions = bucket_expressions(spec, dialect, depth)
+    keys = [f'b{i}' for i in range(len(expressions))]
+    where = bucket_filter(spec['levels'][:depth], buckets) if buckets else ''
+    selected = ', '.join(f'{expression} AS {key}' for expression, key in zip(expressions, keys))
+    return (f"SELECT {', '.join(keys)}, COUNT(*) AS row_count, "
+            f"{d['sum'].format(d['hex32'].format('row_md5', 1))} AS hash_a, {d['sum'].format(d['hex32'].format('row_md5', 9))} AS hash_b "
+            f"FROM (SELECT {selected}, {d['md5'].format(row_text_sql(spec, dialect))} AS row_md5 FROM {spec['source']}{where}) r "
+            f"GROUP BY {', '.join(keys)}")
+
+
+def row_text_rows_sql(spec, dialect, buckets):
+    """SQL teks kanonik semua baris di bucket level terhalus yang diberikan."""
+    return f"SELECT {row_text_sql(spec, dialect)} AS row_text FROM {spec['source']}{bucket_filter(spec['levels'], buckets)}"
+
+
+def mismatched_buckets(dwh, lakehouse, keys):
+    """Bucket yang jumlah baris atau checksum-nya berbeda (bucket yang hanya ada di satu sisi dihitung kosong di sisi lain)."""
+    merged = dwh.merge(lakehouse, on=keys, how='outer', suffixes=('_dwh', '_lakehouse'))
+    measures = ['row_count', 'hash_a', 'hash_b']
+    for measure in measures:
+        for side in ['_dwh', '_lakehouse']:
+            merged[measure + side] = merged[measure + side].fillna(0).astype('int64')
+    differs = pd.Series(False, index=merged.index)
+    for measure in measures:
+        differs |= merged[f'{measure}_dwh'] != merged[f'{measure}_lakehouse']
+    return merged[differs].sort_values(keys).reset_index(drop=True)
+
+
+def reconcile_table(name, run_dwh, run_lakehouse, dwh_dialect, lakehouse_dialect='duckdb', max_drill_buckets=MAX_DRILL_BUCKETS,
+                    dwh_current_only=False):
+    """Rekonsiliasi satu tabel; run_dwh/run_lakehouse menjalankan SQL di masing-masing sisi dan mengembalikan DataFrame.
+
+    Dengan dwh_current_only=True sisi DWH hanya membaca versi berlaku (current_source). Mengembalikan
+    dict ringkasan: jumlah baris kedua sisi, bucket berbeda per level, dan baris yang hanya ada di
+    satu sisi (dari bucket terhalus yang diturunkan).
+    """
+    spec = RECONCILE_TABLES[name]
+    dwh_spec = {**spec, 'source': spec['current_source']} if dwh_current_only and 'current_source' in spec else spec
+    summary = {'table': name, 'dwh_rows': 0, 'lakehouse_rows': 0, 'buckets': 0, 'mismatched_buckets': '', 'only_dwh': 0, 'only_lakehouse': 0}
+    buckets, mismatched_per_level, examples = None, [], []
+    for depth in range(len(spec['levels'])):
+        keys = [f'b{i}' for i in range(depth + 1)]
+        dwh = run_dwh(bucket_checksum_sql(dwh_spec, dwh_dialect, depth, buckets))
+        lakehouse = run_lakehouse(bucket_checksum_sql(spec, lakehouse_dialect, depth, buckets))
+        if depth == 0:
+            summary.update(dwh_rows=int(dwh['row_count'].sum()), lakehouse_rows=int(lakehouse['row_count'].sum()),
+                           buckets=len(set(map(tuple, dwh[keys].values.tolist())) | set(map(tuple, lakehouse[keys].values.tolist()))))
+        mismatched = mismatched_buckets(dwh, lakehouse, keys)
+        mismatched_per_level.append(len(mismatched))
+        if mismatched.empty:
+            break
+        buckets = list(mismatched[keys].head(max_drill_buckets).itertuples(index=False, name=None))
+    else:
+        # Bucket terhalus masih berbeda: baris di dalamnya diambil dari kedua sisi lalu dibandingkan sebagai multiset
+        dwh_rows = Counter(run_dwh(row_text_rows_sql(dwh_spec, dwh_dialect, buckets))['row_text'])
+        lakehouse_rows = Counter(run_lakehouse(row_text_rows_sql(spec, lakehouse_dialect, buckets))['row_text'])
+        only_dwh, only_lakehouse = dwh_rows - lakehouse_rows, lakehouse_rows - dwh_rows
+        summary.update(only_dwh=sum(only_dwh.values()), only_lakehouse=sum(only_lakehouse.values()))
+        examples = [('DWH', row) for row in sorted(only_dwh)[:MAX_EXAMPLE_ROWS]] + [('Lakehouse', row) for row in sorted(only_lakehouse)[:MAX_EXAMPLE_ROWS]]
+    summary['mismatched_buckets'] = ' -> '.join(str(count) for count in mismatched_per_level)
+    summary['match'] = mismatched_per_level[0] == 0
+    summary['examples'] = examples
+    return summary
+
+
+def reconcile_tables(run_dwh, run_lakehouse, dwh_dialect, tables=None, lakehouse_dialect='duckdb', dwh_current_tables=()):
+    """Rekonsiliasi beberapa tabel (default semua RECONCILE_TABLES) dan mencetak hasilnya; mengembalikan DataFrame ringkasan.
+
+    `dwh_current_tables` berisi tabel DWH yang memiliki kolom is_current (hanya versi berlaku yang dibandingkan).
+    """
+    summaries = []
+    for name in tables or list(RECONCILE_TABLES):
+        try:
+            summary = reconcile_table(name, run_dwh, run_lakehouse, dwh_dialect, lakehouse_dialect,
+                                      dwh_current_only=name in dwh_current_tables)
+        except Exception as e:
+            print(f"  - {name}: gagal direkonsiliasi: {e}")
+            summaries.append({'table': name, 'match': False})
+            continue
+        status = 'SAMA' if summary['match'] else f"BERBEDA (bucket berbeda per level: {summary['mismatched_buckets']})"
+        print(f"  - {name}: {summary['dwh_rows']} vs {summary['lakehouse_rows']} baris, {summary['buckets']} bucket, {status}")
+        for side, row in summary.pop('examples'):
+            print(f"      hanya di {side}: {row}")
+        summaries.append(summary)
+    return pd.DataFrame(summaries).set_index('table')
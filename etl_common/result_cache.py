@@ -0,0 +1,135 @@
+import os
+import re
+import statistics
+import time
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from etl_common.layer_cache import cache_key
+
+# Cache hasil kueri analitik di disk lokal (satu file Parquet per hasil). Kuncinya = backend + versi data
+# + SQL yang dinormalisasi, sehingga hasil otomatis tidak terpakai lagi begitu load baru mengubah versi data
+# (snapshot Gold baru di lakehouse, batch load baru di DWH). Entri lama dipangkas dengan LRU.
+RESULT_CACHE_DIR = os.environ.get('GRAVITY_RESULT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'gravity_books', 'results'))
+RESULT_CACHE_MAX_BYTES = 256 * 1024**2
+RESULT_CACHE_MAX_ENTRIES = 1000
+
+# Latensi setiap lookup per backend: {backend: {'hit': [...], 'miss': [...]}}
+_stats = {}
+
+_STRING_LITERAL_RE = re.compile(r"('(?:[^']|'')*')")
+
+
+def normalize_sql(sql):
+    """SQL tanpa komentar, spasi berlebih dan titik koma penutup (isi literal string tidak diubah)."""
+    parts = _STRING_LITERAL_RE.split(sql)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r'--[^\n]*|/\*.*?\*/', ' ', parts[i], flags=re.DOTALL)
+        part = re.sub(r'\s+', ' ', part)
+        parts[i] = re.sub(r'\s*([,()=<>+*/-])\s*', r'\1', part)
+    return ''.join(parts).strip().rstrip(';').strip()
+
+
+def result_key(backend, data_version, sql):
+    """Kunci cache satu hasil kueri."""
+    return cache_key('result', backend, data_version, normalize_sql(sql))
+
+
+def load_result(key, cache_dir=None):
+    """DataFrame hasil yang tersimpan untuk `key` atau None; mtime file diperbarui sebagai penanda LRU."""
+    path = os.path.join(cache_dir or RESULT_CACHE_DIR, f'{key}.parquet')
+    try:
+        table = pq.read_table(path)
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    os.utime(path)
+    return table.to_pandas()
+
+
+def store_result(key, df, cache_dir=None):
+    """Menyimpan hasil sebagai Parquet (tulis ke file sementara lalu rename) dan memangkas cache.
+
+    Hasil yang tidak bisa diubah ke Arrow (kolom objek campuran) tidak di-cache; mengembalikan False.
+    """
+    cache_dir = cache_dir or RESULT_CACHE_DIR
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return False
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, f'.{key}.{uuid.uuid4().hex}.tmp')
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, os.path.join(cache_dir, f'{key}.parquet'))
+    evict(cache_dir)
+    return True
+
+
+def evict(cache_dir=None, max_bytes=RESULT_CACHE_MAX_BYTES, max_entries=RESULT_CACHE_MAX_ENTRIES):
+    """Menghapus hasil yang paling lama tidak dipakai sampai ukuran dan jumlah entri cache di bawah batas.
+
+    Mengembalikan jumlah entri yang dihapus.
+    """
+    cache_dir = cache_dir or RESULT_CACHE_DIR
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.parquet'):
+            path = os.path.join(cache_dir, name)
+            entries.append((os.path.getmtime(path), path, os.path.getsize(path)))
+    total, count, removed = sum(size for _, _, size in entries), len(entries), 0
+    for _, path, size in sorted(entries):
+        if total <= max_bytes and count <= max_entries:
+            break
+        os.remove(path)
+        total -= size
+        count -= 1
+        removed += 1
+    return removed
+
+
+def cached_query(backend, data_version, sql, run_fn, cache_dir=None):
+    """Hasil kueri dari cache, atau run_fn() yang hasilnya lalu disimpan.
+
+    Tanpa `data_version` (versi data tidak diketahui) kueri selalu dijalankan dan tidak dicatat di statistik.
+    """
+    if data_version is None:
+        return run_fn()
+    start = time.perf_counter()
+    key = result_key(backend, data_version, sql)
+    df = load_result(key, cache_dir)
+    outcome = 'hit'
+    if df is None:
+        outcome = 'miss'
+        df = run_fn()
+        if df is not None:
+            store_result(key, df, cache_dir)
+    _stats.setdefault(backend, {'hit': [], 'miss': []})[outcome].append(time.perf_counter() - start)
+    return df
+
+
+def cache_stats():
+    """Ringkasan per backend: jumlah hit/miss dan latensi median (detik)."""
+    summary = {}
+    for backend, outcomes in _stats.items():
+        summary[backend] = {
+            'hits': len(outcomes['hit']), 'misses': len(outcomes['miss']),
+            'hit_seconds': statistics.median(outcomes['hit']) if outcomes['hit'] else None,
+            'miss_seconds': statistics.median(outcomes['miss']) if outcomes['miss'] else None,
+        }
+    return summary
+
+
+def print_cache_stats():
+    """Mencetak jumlah hit/miss dan latensi median cache hasil per backend."""
+    for backend, stats in cache_stats().items():
+        lookups = stats['hits'] + stats['misses']
+        hit_text = f"{stats['hit_seconds']:.4f}" if stats['hit_seconds'] is not None else '-'
+        miss_text = f"{stats['miss_seconds']:.4f}" if stats['miss_seconds'] is not None else '-'
+        print(f"  - {backend}: {stats['hits']} hit, {stats['misses']} miss ({100 * stats['hits'] / lookups:.0f}% hit), "
+              f"latensi median hit {hit_text} detik, miss {miss_text} detik")
+
+
+def reset_stats():
+    """Mengosongkan statistik hit/miss (misalnya antar sesi benchmark)."""
+    _stats.clear()
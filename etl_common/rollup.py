@@ -0,0 +1,286 @@
+import os
+import re
+import shutil
+
+from etl_common import schema, transform_duckdb
+from etl_common.layer_cache import file_digest
+
+# Rollup Gold: agregat fact_book_sales per bulan pada grain tambahan. Setiap rollup dipartisi
+# year_val=/month_val= seperti fakta, sehingga bulan yang fakta (dan dimensi yang dibacanya) tidak
+# berubah cukup disalin dari snapshot sebelumnya dan hanya bulan dengan baris fakta baru yang dihitung ulang.
+# - 'keys': kolom grain selain bulan
+# - 'dims': dimensi yang ikut dibaca (ikut menentukan apakah partisi lama masih berlaku)
+ROLLUP_MEASURES = "CAST(COUNT(*) AS INTEGER) AS sales_count, SUM(f.price) AS price_sum, SUM(f.shipping_cost) AS shipping_cost_sum"
+ROLLUPS = {
+    'agg_month_book': {
+        'keys': ['book_sk'], 'dims': [],
+        'sql': f"SELECT f.book_sk, {ROLLUP_MEASURES} FROM fact f GROUP BY f.book_sk ORDER BY f.book_sk",
+    },
+    'agg_month_customer': {
+        'keys': ['customer_sk'], 'dims': [],
+        'sql': f"SELECT f.customer_sk, {ROLLUP_MEASURES} FROM fact f GROUP BY f.customer_sk ORDER BY f.customer_sk",
+    },
+    'agg_month_country': {
+        'keys': ['country'], 'dims': ['dim_customer'],
+        'sql': f"""SELECT c.country, {ROLLUP_MEASURES} FROM fact f JOIN dim_customer c ON c.customer_sk = f.customer_sk
+                   GROUP BY c.country ORDER BY c.country""",
+    },
+    'agg_month_shipping': {
+        'keys': ['shipping_sk'], 'dims': [],
+        'sql': f"SELECT f.shipping_sk, {ROLLUP_MEASURES} FROM fact f GROUP BY f.shipping_sk ORDER BY f.shipping_sk",
+    },
+}
+# Nama file data di setiap partisi (lihat schema.write_partitioned_parquet)
+PARTITION_FILE = 'data_0.parquet'
+
+
+def _partition_dirs(table_root):
+    """Path relatif partisi (year_val=Y/month_val=M) sebuah dataset berpartisi lokal, urut."""
+    return sorted(os.path.relpath(root, table_root).replace(os.sep, '/')
+                  for root, _, names in os.walk(table_root) if PARTITION_FILE in names)
+
+
+def _same_file(path, previous_path):
+    """True jika file lama ada dan isinya identik."""
+    return os.path.exists(previous_path) and file_digest(path) == file_digest(previous_path)
+
+
+def build_rollups(gold_root, previous_root=None, parquet_options=None):
+    """Menulis semua ROLLUPS dari fakta dan dimensi yang sudah ada di folder Gold lokal `gold_root`.
+
+    `previous_root` adalah folder Gold run sebelumnya (dengan kode yang sama): partisi rollup
+    sebuah bulan disalin dari sana jika file fakta bulan itu dan file dimensi yang dibaca rollup
+    identik, selain itu dihitung ulang dari baris fakta bulan tersebut.
+    """
+    fact_root = f'{gold_root}/fact_book_sales'
+    dims_unchanged = {name: previous_root is not None and _same_file(f'{gold_root}/{name}.parquet', f'{previous_root}/{name}.parquet')
+                      for spec in ROLLUPS.values() for name in spec['dims']}
+    con = transform_duckdb.connect()
+    built, reused = 0, 0
+    try:
+        con.execute(f"CREATE VIEW dim_customer AS SELECT * FROM read_parquet('{gold_root}/dim_customer.parquet')")
+        for partition in _partition_dirs(fact_root):
+            fact_path = f'{fact_root}/{partition}/{PARTITION_FILE}'
+            fact_unchanged = previous_root is not None and _same_file(fact_path, f'{previous_root}/fact_book_sales/{partition}/{PARTITION_FILE}')
+            con.execute(f"CREATE OR REPLACE VIEW fact AS SELECT * FROM read_parquet('{fact_path}')")
+            for name, spec in ROLLUPS.items():
+                output_dir = f'{gold_root}/{name}/{partition}'
+                os.makedirs(output_dir, exist_ok=True)
+                previous_path = f'{previous_root}/{name}/{partition}/{PARTITION_FILE}' if previous_root else None
+                if fact_unchanged and all(dims_unchanged[dim] for dim in spec['dims']) and os.path.exists(previous_path):
+                    shutil.copyfile(previous_path, f'{output_dir}/{PARTITION_FILE}')
+                    reused += 1
+                else:
+                    schema.write_parquet(con.execute(spec['sql']).fetch_arrow_table(), f'{output_dir}/{PARTITION_FILE}', name, parquet_options)
+                    built += 1
+    finally:
+        con.close()
+    print(f"  - Rollup Gold ({', '.join(ROLLUPS)}): {built} partisi dihitung, {reused} partisi dipakai ulang dari snapshot sebelumnya.")
+    return built, reused
+
+
+# --- Query rewrite ---
+# Kueri bintang berbentuk `FROM fact_book_sales f JOIN dim_x a ON f.<sk> = a.<sk> ... GROUP BY ...`
+# dengan agregat COUNT/SUM atas measure fakta dialihkan ke rollup terkecil yang grain-nya mencakup
+# semua kolom yang dipakai. Bentuk lain (subquery, outer join, DISTINCT, window, agregat lain,
+# kolom fakta tanpa alias) tidak di-rewrite dan tetap membaca fakta.
+
+# Dimensi -> surrogate key penghubungnya ke fakta
+DIMENSION_KEYS = {'dim_date': 'date_sk', 'dim_customer': 'customer_sk', 'dim_book': 'book_sk', 'dim_shipping': 'shipping_sk'}
+# Kolom dim_date yang konstan dalam satu bulan (grain bulan rollup)
+MONTH_ATTRIBUTES = ['year_val', 'month_val', 'month_name', 'quarter_val']
+# Measure fakta -> kolom jumlahnya di rollup
+MEASURE_SUMS = {'price': 'price_sum', 'shipping_cost': 'shipping_cost_sum'}
+# Kolom grain rollup yang berasal dari atribut dimensi (kolom rollup -> (dimensi, kolom dimensi))
+DENORMALIZED_KEYS = {'country': ('dim_customer', 'country')}
+FACT_COLUMNS = ['customer_sk', 'book_sk', 'shipping_sk', 'date_sk', 'price', 'shipping_cost']
+
+_FROM_RE = re.compile(r'\bFROM\s+fact_book_sales\s+(?:AS\s+)?(\w+)', re.IGNORECASE)
+_JOIN_RE = re.compile(r'\b(?:INNER\s+)?JOIN\s+(\w+)\s+(?:AS\s+)?(\w+)\s+ON\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)', re.IGNORECASE)
+_AGGREGATE_RE = re.compile(r'\b(COUNT|SUM)\s*\(([^()]*)\)', re.IGNORECASE)
+_UNSUPPORTED_RE = re.compile(
+    r'\b(LEFT|RIGHT|FULL|OUTER|CROSS|NATURAL|SEMI|ANTI|ASOF|POSITIONAL|USING|UNION|EXCEPT|INTERSECT|DISTINCT|OVER|FILTER|QUALIFY)\b'
+    r'|\b(AVG|MIN|MAX|MEDIAN|MODE|PRODUCT|STRING_AGG|LIST|ARRAY_AGG|ANY_VALUE|FIRST|LAST|ARG_MIN|ARG_MAX|COUNT_IF|'
+    r'STDDEV\w*|VAR\w*|QUANTILE\w*|APPROX\w*)\s*\(', re.IGNORECASE)
+_QUALIFIED_RE = re.compile(r'\b(\w+)\.(\w+)\b')
+_BARE_FACT_COLUMN_RE = re.compile(r'(?<![.\w])(' + '|'.join(FACT_COLUMNS) + r')\b', re.IGNORECASE)
+
+
+def _aggregate_measure(function, argument, fact_alias):
+    """'count' untuk COUNT(*)/COUNT(f.kolom), daftar kolom jumlah rollup untuk SUM(f.m1 + f.m2 ...), atau None."""
+    argument = argument.strip()
+    if function == 'COUNT':
+        # Kolom fakta tidak pernah null (baris tanpa SK/harga/biaya dibuang saat membangun fakta)
+        match = re.fullmatch(rf'{re.escape(fact_alias)}\.(\w+)', argument)
+        return 'count' if argument == '*' or (match and match.group(1) in FACT_COLUMNS) else None
+    columns = []
+    for term in argument.split('+'):
+        match = re.fullmatch(rf'{re.escape(fact_alias)}\.(\w+)', term.strip())
+        if not match or match.group(1) not in MEASURE_SUMS:
+            return None
+        columns.append(MEASURE_SUMS[match.group(1)])
+    return columns
+
+
+def _blank(sql, spans):
+    """SQL dengan bagian-bagian `spans` diganti spasi (posisi karakter lain tidak bergeser)."""
+    chars = list(sql)
+    for start, end in spans:
+        chars[start:end] = ' ' * (end - start)
+    return ''.join(chars)
+
+
+def analyze_query(sql):
+    """Struktur kueri bintang (alias fakta, join, agregat, kolom yang dipakai) atau None jika bentuknya tidak didukung."""
+    if len(re.findall(r'\bSELECT\b', sql, re.IGNORECASE)) != 1 or _UNSUPPORTED_RE.search(sql):
+        return None
+    from_matches = list(_FROM_RE.finditer(sql))
+    if len(from_matches) != 1 or len(re.findall(r'\bfact_book_sales\b', sql)) != 1:
+        return None
+    fact_alias = from_matches[0].group(1)
+
+    joins = []
+    for match in _JOIN_RE.finditer(sql):
+        table, alias, left_alias, left_column, right_alias, right_column = match.groups()
+        key = DIMENSION_KEYS.get(table)
+        if key is None or {(left_alias, left_column), (right_alias, right_column)} != {(fact_alias, key), (alias, key)}:
+            return None
+        joins.append({'table': table, 'alias': alias, 'span': match.span()})
+    if len(joins) != len(re.findall(r'\bJOIN\b', sql, re.IGNORECASE)):
+        return None
+
+    aggregates = []
+    for match in _AGGREGATE_RE.finditer(sql):
+        measure = _aggregate_measure(match.group(1).upper(), match.group(2), fact_alias)
+        if measure is None:
+            return None
+        aggregates.append({'span': match.span(), 'measure': measure})
+
+    # Kolom yang dipakai di luar agregat dan kondisi join (SELECT, WHERE, GROUP BY, ORDER BY)
+    rest = _blank(sql, [from_matches[0].span()] + [join['span'] for join in joins] + [aggregate['span'] for aggregate in aggregates])
+    if _BARE_FACT_COLUMN_RE.search(rest):
+        return None
+    columns = {}
+    for alias, column in _QUALIFIED_RE.findall(rest):
+        columns.setdefault(alias, set()).add(column)
+    if set(columns) - {fact_alias} - {join['alias'] for join in joins}:
+        return None
+    for join in joins:
+        join['columns'] = columns.get(join['alias'], set())
+    return {'fact_alias': fact_alias, 'from_span': from_matches[0].span(), 'joins': joins,
+            'aggregates': aggregates, 'fact_columns': columns.get(fact_alias, set())}
+
+
+def _join_rewrite(join, keys):
+    """Cara menjawab satu join dari rollup dengan grain `keys`: 'month', 'keep', 'drop' atau None (tidak tercakup)."""
+    if join['table'] == 'dim_date':
+        return 'month' if join['columns'] <= set(MONTH_ATTRIBUTES) else None
+    if DIMENSION_KEYS[join['table']] in keys:
+        return 'keep'
+    for key in keys:
+        table, column = DENORMALIZED_KEYS.get(key, (None, None))
+        if table == join['table'] and join['columns'] <= {column}:
+            return 'drop'
+    return None
+
+
+def covers(name, plan):
+    """True jika rollup `name` bisa menjawab kueri hasil analyze_query."""
+    keys = ROLLUPS[name]['keys']
+    if not plan['fact_columns'] <= set(keys) | {'year_val', 'month_val'}:
+        return False
+    return all(_join_rewrite(join, keys) is not None for join in plan['joins'])
+
+
+def rewrite_query(sql, rollup_rows):
+    """Mengalihkan kueri ke rollup terkecil (`rollup_rows` = {nama rollup tersedia: jumlah baris}) yang mencakupnya.
+
+    Mengembalikan (SQL, nama rollup), atau (SQL asli, None) jika tidak ada rollup yang mencakup kueri.
+    """
+    plan = analyze_query(sql)
+    candidates = [name for name in ROLLUPS if name in rollup_rows and plan is not None and covers(name, plan)]
+    if not candidates:
+        return sql, None
+    name = min(candidates, key=lambda candidate: rollup_rows[candidate])
+    fact_alias, keys = plan['fact_alias'], ROLLUPS[name]['keys']
+
+    replacements = [(plan['from_span'], f'FROM {name} {fact_alias}')]
+    for aggregate in plan['aggregates']:
+        if aggregate['measure'] == 'count':
+            replacements.append((aggregate['span'], f'CAST(SUM({fact_alias}.sales_count) AS BIGINT)'))
+        else:
+            replacements.append((aggregate['span'], 'SUM(' + ' + '.join(f'{fact_alias}.{column}' for column in aggregate['measure']) + ')'))
+    dropped_aliases = []
+    for join in plan['joins']:
+        action, alias = _join_rewrite(join, keys), join['alias']
+        if action == 'month':
+            replacements.append((join['span'], f"JOIN (SELECT DISTINCT {', '.join(MONTH_ATTRIBUTES)} FROM dim_date) {alias} "
+                                               f"ON {alias}.year_val = {fact_alias}.year_val AND {alias}.month_val = {fact_alias}.month_val"))
+        elif action == 'drop':
+            replacements.append((join['span'], ''))
+            dropped_aliases.append(alias)
+
+    for (start, end), replacement in sorted(replacements, reverse=True):
+        sql = sql[:start] + replacement + sql[end:]
+    for alias in dropped_aliases:
+        sql = re.sub(rf'\b{re.escape(alias)}\.(\w+)\b', rf'{fact_alias}.\1', sql)
+    return sql, name
+
+
+# --- Filter partisi ---
+# Fakta dan rollup dipartisi year_val=/month_val=, tetapi kueri biasanya memfilter tanggal lewat
+# dim_date. Filter sederhana pada d.year_val/d.month_val (konjungsi di WHERE, nilai literal
+# integer) disalin sebagai filter f.year_val/f.month_val agar DuckDB hanya membaca partisi yang relevan.
+# Kolom partisi fakta diturunkan dari date_sk, jadi untuk inner join lewat date_sk nilainya sama.
+PARTITION_COLUMNS = ['year_val', 'month_val']
+
+_WHERE_RE = re.compile(r'\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|;|$)', re.IGNORECASE | re.DOTALL)
+_INTEGER = r'-?\d+'
+_PARTITION_PREDICATE_RES = [
+    re.compile(rf'(\w+)\.(\w+)\s*(?:=|<>|!=|<=|>=|<|>)\s*{_INTEGER}', re.IGNORECASE),
+    re.compile(rf'(\w+)\.(\w+)\s+(?:NOT\s+)?IN\s*\(\s*{_INTEGER}(?:\s*,\s*{_INTEGER})*\s*\)', re.IGNORECASE),
+    re.compile(rf'(\w+)\.(\w+)\s+BETWEEN\s+{_INTEGER}\s+AND\s+{_INTEGER}', re.IGNORECASE),
+]
+
+
+def _where_conjuncts(where):
+    """Konjungsi tingkat atas sebuah klausa WHERE (AND di dalam BETWEEN ... AND ... tidak memisah)."""
+    conjuncts, current = [], []
+    for part in re.split(r'(\bAND\b)', where, flags=re.IGNORECASE):
+        if re.fullmatch(r'AND', part, re.IGNORECASE) and not re.search(r'\bBETWEEN\s+\S+\s*$', ''.join(current), re.IGNORECASE):
+            conjuncts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(part)
+    conjuncts.append(''.join(current).strip())
+    return conjuncts
+
+
+def add_partition_filters(sql):
+    """Menambahkan filter f.year_val/f.month_val yang setara dengan filter dim_date di WHERE.
+
+    Hanya untuk kueri dengan satu SELECT, fakta di FROM dan inner join dim_date lewat date_sk,
+    tanpa OR/NOT di WHERE; setiap konjungsi yang berbentuk `d.kolom op angka`, `d.kolom IN (...)`
+    atau `d.kolom BETWEEN a AND b` untuk kolom partisi disalin dengan alias fakta. Kueri lain
+    dikembalikan apa adanya.
+    """
+    if len(re.findall(r'\bSELECT\b', sql, re.IGNORECASE)) != 1 or re.search(r'\b(LEFT|RIGHT|FULL|OUTER|CROSS|NATURAL|UNION)\b', sql, re.IGNORECASE):
+        return sql
+    from_match, where_match = _FROM_RE.search(sql), _WHERE_RE.search(sql)
+    if from_match is None or where_match is None or re.search(r'\b(OR|NOT)\b', re.sub(r'\bNOT\s+IN\b', 'IN', where_match.group(1), flags=re.IGNORECASE), re.IGNORECASE):
+        return sql
+    fact_alias = from_match.group(1)
+    date_aliases = {alias for table, alias, left_alias, left_column, right_alias, right_column in _JOIN_RE.findall(sql)
+                    if table == 'dim_date' and {(left_alias, left_column), (right_alias, right_column)} == {(fact_alias, 'date_sk'), (alias, 'date_sk')}}
+    filters = []
+    for conjunct in _where_conjuncts(where_match.group(1)):
+        for pattern in _PARTITION_PREDICATE_RES:
+            match = pattern.fullmatch(conjunct)
+            if match and match.group(1) in date_aliases and match.group(2) in PARTITION_COLUMNS:
+                filters.append(f'{fact_alias}.{match.group(2)}' + conjunct[match.end(2):])
+                break
+    if not filters:
+        return sql
+    end = where_match.end(1)
+    tail = sql[end:].lstrip()
+    return sql[:end].rstrip() + ''.join(f' AND {condition}' for condition in filters) + (f' {tail}' if tail else '')
@@ -0,0 +1,160 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Tipe ringkas setiap kolom skema bintang, dipakai bersama oleh DWH, Gold dan fan-out:
+# - 'category'     : teks berkardinalitas rendah -> pandas Categorical / Arrow dictionary
+# - 'string'       : teks lain -> string berbasis PyArrow (tanpa objek Python per nilai)
+# - 'int8'..'int32': kunci dan atribut bilangan bulat diperkecil (cast aman: nilai di luar rentang -> error)
+# - 'decimal(p,s)' : uang dengan presisi tetap, sama dengan DECIMAL(p,s) di DWH
+STAR_SCHEMA_TYPES = {
+    'dim_customer': {
+        'customer_sk': 'int32', 'customer_id': 'int32', 'first_name': 'string', 'last_name': 'string', 'email': 'string',
+        'address_status': 'category', 'street_number': 'string', 'street_name': 'string', 'city': 'string', 'country': 'category',
+    },
+    'dim_book': {
+        'book_sk': 'int32', 'book_id': 'int32', 'title': 'string', 'isbn13': 'string', 'language_code': 'category',
+        'language_name': 'category', 'num_pages': 'int16', 'publication_date': 'timestamp', 'publisher_name': 'category',
+        'author_name': 'string',
+    },
+    'dim_shipping': {'shipping_sk': 'int16', 'shipping_method_id': 'int16', 'shipping_method': 'category'},
+    'dim_date': {
+        'full_date': 'timestamp', 'date_sk': 'int32', 'day_val': 'int8', 'month_val': 'int8', 'year_val': 'int16',
+        'quarter_val': 'int8', 'day_name': 'category', 'month_name': 'category',
+    },
+    'fact_book_sales': {
+        'customer_sk': 'int32', 'book_sk': 'int32', 'shipping_sk': 'int16', 'date_sk': 'int32',
+        'price': 'decimal(5,2)', 'shipping_cost': 'decimal(6,2)',
+    },
+    # Rollup Gold per bulan (etl_common.rollup)
+    'agg_month_book': {'book_sk': 'int32', 'sales_count': 'int32', 'price_sum': 'decimal(18,2)', 'shipping_cost_sum': 'decimal(18,2)'},
+    'agg_month_customer': {'customer_sk': 'int32', 'sales_count': 'int32', 'price_sum': 'decimal(18,2)', 'shipping_cost_sum': 'decimal(18,2)'},
+    'agg_month_country': {'country': 'category', 'sales_count': 'int32', 'price_sum': 'decimal(18,2)', 'shipping_cost_sum': 'decimal(18,2)'},
+    'agg_month_shipping': {'shipping_sk': 'int16', 'sales_count': 'int32', 'price_sum': 'decimal(18,2)', 'shipping_cost_sum': 'decimal(18,2)'},
+}
+
+# Opsi default penulis Parquet Gold (bisa ditimpa per pemanggilan, misalnya dari CLI etl_lakehouse)
+PARQUET_WRITE_OPTIONS = {
+    'compression': 'zstd',
+    'row_group_size': 1_000_000,
+    'use_dictionary': True,
+}
+PARQUET_COMPRESSIONS = ['zstd', 'snappy', 'gzip', 'brotli', 'lz4', 'none']
+
+
+def arrow_type(logical_type):
+    """Tipe Arrow untuk satu tipe logis STAR_SCHEMA_TYPES."""
+    if logical_type == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    if logical_type == 'string':
+        return pa.string()
+    if logical_type == 'timestamp':
+        return pa.timestamp('ns')
+    if logical_type.startswith('decimal('):
+        precision, scale = (int(part) for part in logical_type[len('decimal('):-1].split(','))
+        return pa.decimal128(precision, scale)
+    return pa.type_for_alias(logical_type)
+
+
+def cast_column(column, logical_type):
+    """Cast satu kolom Arrow ke tipe ringkasnya.
+
+    Kategori di-dictionary-encode menurut urutan kemunculan (hasilnya sama apa pun engine
+    sumbernya), dan uang bertipe float dibulatkan ke skala desimal dulu agar cast-nya eksak.
+    """
+    target = arrow_type(logical_type)
+    if logical_type == 'category':
+        if pa.types.is_dictionary(column.type):
+            column = pc.cast(column, pa.string())
+        column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+        return pc.cast(column, pa.string()).dictionary_encode()
+    if pa.types.is_decimal(target) and pa.types.is_floating(column.type):
+        column = pc.round(column, target.scale)
+    return pc.cast(column, target)
+
+
+def to_arrow_table(data, table_name):
+    """DataFrame/Arrow Table -> Arrow Table dengan tipe STAR_SCHEMA_TYPES (kolom di luar skema dibiarkan).
+
+    Metadata pandas dibuang sehingga hasil dari jalur pandas dan DuckDB identik.
+    """
+    table = pa.Table.from_pandas(data, preserve_index=False) if isinstance(data, pd.DataFrame) else data
+    types = STAR_SCHEMA_TYPES.get(table_name, {})
+    columns = [cast_column(table[name], types[name]) if name in types else table[name] for name in table.column_names]
+    return pa.table(columns, names=table.column_names)
+
+
+def _pandas_dtype(arrow_dtype):
+    """types_mapper to_pandas: string dan desimal tetap berbasis Arrow (tanpa objek Python)."""
+    if pa.types.is_string(arrow_dtype):
+        return pd.StringDtype('pyarrow')
+    if pa.types.is_decimal(arrow_dtype):
+        return pd.ArrowDtype(arrow_dtype)
+    return None
+
+
+def compact_dataframe(df, table_name):
+    """DataFrame dengan tipe ringkas: Categorical, string[pyarrow], integer kecil dan desimal Arrow.
+
+    Kolom integer yang berisi null tetap float64 seperti hasil pandas biasa.
+    """
+    return to_arrow_table(df, table_name).to_pandas(types_mapper=_pandas_dtype)
+
+
+def memory_mb(df):
+    """Ukuran DataFrame di memori (MB, termasuk isi string)."""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def compact_tables(tables):
+    """Menerapkan compact_dataframe ke dict {nama tabel: DataFrame} dan mencetak laporan memori sebelum/sesudah.
+
+    Mengembalikan dict baru; DataFrame lama dilepas satu per satu agar puncak memori tidak berlipat.
+    """
+    compacted = {}
+    before_total, after_total = 0.0, 0.0
+    for name in list(tables):
+        df = tables[name]
+        before = memory_mb(df)
+        compacted[name] = compact_dataframe(df, name)
+        del df
+        after = memory_mb(compacted[name])
+        before_total += before
+        after_total += after
+        print(f"  - Ukuran memori untuk {name}: {before:.2f} MB -> {after:.2f} MB")
+    saved = 100 * (1 - after_total / before_total) if before_total else 0.0
+    print(f"  - Total memori: {before_total:.2f} MB -> {after_total:.2f} MB ({saved:.0f}% lebih kecil)")
+    return compacted
+
+
+def parquet_write_options(options=None):
+    """Opsi pq.write_table dari PARQUET_WRITE_OPTIONS ditimpa `options` (nilai None diabaikan)."""
+    merged = dict(PARQUET_WRITE_OPTIONS)
+    merged.update({key: value for key, value in (options or {}).items() if value is not None})
+    return merged
+
+
+def write_parquet(data, path, table_name, options=None):
+    """Menulis satu tabel skema bintang ke Parquet dengan tipe ringkas dan opsi penulis yang dipilih.
+
+    Desimal disimpan sebagai INT32/INT64 fisik (bukan FIXED_LEN_BYTE_ARRAY) sehingga lebih kecil dan
+    lebih cepat dibaca DuckDB.
+    """
+    pq.write_table(to_arrow_table(data, table_name), path, store_decimal_as_integer=True, **parquet_write_options(options))
+
+
+def write_partitioned_parquet(partitions, root, table_name, options=None):
+    """Menulis dataset berpartisi Hive dari iterable (dict nilai partisi, data) -> <root>/<kolom>=<nilai>/data_0.parquet.
+
+    Kolom partisi tidak ikut ditulis ke file. Mengembalikan jumlah partisi.
+    """
+    count = 0
+    for values, data in partitions:
+        partition_dir = os.path.join(root, *(f'{column}={value}' for column, value in values.items()))
+        os.makedirs(partition_dir, exist_ok=True)
+        write_parquet(data, os.path.join(partition_dir, 'data_0.parquet'), table_name, options)
+        count += 1
+    return count
@@ -0,0 +1,164 @@
+import math
+import os
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from etl_common import schema
+
+# Perawatan dataset Gold berpartisi: file kecil di setiap partisi digabung menjadi file seukuran target,
+# baris fakta diklaster (sort leksikografis atau Z-order) agar statistik min/max row group bisa dipakai
+# untuk melewati row group, lalu ditulis ulang dengan page index atau bloom filter.
+
+# Ukuran file target setelah compaction
+TARGET_FILE_BYTES = 128 * 1024**2
+# Baris per row group hasil perawatan (sama dengan ukuran row group DuckDB)
+ROW_GROUP_SIZE = 122_880
+# Kolom klaster fakta yang diizinkan dan default-nya
+CLUSTER_COLUMNS = ['date_sk', 'customer_sk', 'book_sk', 'shipping_sk']
+DEFAULT_SORT_BY = ['date_sk', 'customer_sk']
+# Peluang false positive bloom filter (writer DuckDB)
+BLOOM_FILTER_FPP = 0.01
+# Byte dictionary DuckDB per baris row group: cukup agar kolom SK yang semua nilainya unik tetap
+# dictionary-encoded (syarat bloom filter DuckDB); DuckDB mengalokasikan buffer sebesar batas ini per kolom
+BLOOM_DICTIONARY_BYTES_PER_ROW = 8
+
+# Filter yang mewakili drill-down dari kueri uji: (label, kolom, SQL pemilih nilai atas view `fact`)
+PRUNING_PROBES = [
+    ('date_sk = tanggal terakhir', 'date_sk', 'SELECT MAX(date_sk) FROM fact'),
+    ('customer_sk = pelanggan teratas (kueri 3)', 'customer_sk',
+     'SELECT customer_sk FROM fact GROUP BY customer_sk ORDER BY SUM(price + shipping_cost) DESC, customer_sk LIMIT 1'),
+    ('book_sk = buku terlaris (kueri 2)', 'book_sk', 'SELECT book_sk FROM fact GROUP BY book_sk ORDER BY COUNT(*) DESC, book_sk LIMIT 1'),
+]
+
+
+def dataset_files(table_root):
+    """{partisi relatif: [file Parquet urut nama]} sebuah dataset berpartisi lokal ('' untuk file di akar)."""
+    partitions = {}
+    for root, _, names in os.walk(table_root):
+        files = sorted(os.path.join(root, name) for name in names if name.endswith('.parquet'))
+        if files:
+            partitions[os.path.relpath(root, table_root).replace(os.sep, '/')] = files
+    return dict(sorted(partitions.items()))
+
+
+def zorder_indices(table, columns):
+    """Urutan baris menurut kurva Z (Morton) atas rank setiap kolom; semua kolom mendapat bobot yang sama."""
+    bits = min(21, 64 // len(columns))
+    codes = np.zeros(table.num_rows, dtype=np.uint64)
+    ranks = []
+    for column in columns:
+        _, rank = np.unique(table[column].to_numpy(zero_copy_only=False), return_inverse=True)
+        # Rank diskalakan ke `bits` bit agar kolom dengan kardinalitas berbeda tetap seimbang di kurva
+        scale = ((1 << bits) - 1) / max(int(rank.max()) if len(rank) else 0, 1)
+        ranks.append((rank * scale).astype(np.uint64))
+    for bit in range(bits):
+        for i, rank in enumerate(ranks):
+            codes |= ((rank >> np.uint64(bit)) & np.uint64(1)) << np.uint64(bit * len(columns) + i)
+    return np.argsort(codes, kind='stable')
+
+
+def cluster_table(table, sort_by=None, zorder_by=None):
+    """Arrow Table yang baris-barisnya diurutkan menurut `sort_by` atau Z-order `zorder_by` (tanpa keduanya: apa adanya)."""
+    if zorder_by:
+        return table.take(zorder_indices(table, zorder_by))
+    if sort_by:
+        return table.sort_by([(column, 'ascending') for column in sort_by])
+    return table
+
+
+def get_bloom_connection():
+    """Koneksi DuckDB untuk menulis file dengan bloom filter; satu koneksi dipakai untuk seluruh run perawatan."""
+    con = duckdb.connect()
+    con.execute("SET preserve_insertion_order = true;")
+    return con
+
+
+def write_maintained_file(table, path, table_name, row_group_size=ROW_GROUP_SIZE, bloom_con=None, parquet_options=None):
+    """Menulis satu file hasil perawatan.
+
+    Default-nya lewat PyArrow (etl_common.schema) dengan page index (column/offset index). Jika
+    `bloom_con` (dari get_bloom_connection) diberikan, file ditulis oleh DuckDB lewat koneksi itu,
+    yang membuat bloom filter untuk kolom dictionary-encoded (termasuk kolom SK); writer DuckDB
+    tidak menulis page index.
+    """
+    options = schema.parquet_write_options(parquet_options)
+    if bloom_con is None:
+        schema.write_parquet(table, path, table_name, {**options, 'row_group_size': row_group_size, 'write_page_index': True})
+        return
+    bloom_con.register('maintained', schema.to_arrow_table(table, table_name))
+    try:
+        bloom_con.execute(f"COPY (SELECT * FROM maintained) TO '{path}' (FORMAT parquet, COMPRESSION {options['compression']}, "
+                          f"ROW_GROUP_SIZE {row_group_size}, BLOOM_FILTER_FALSE_POSITIVE_RATIO {BLOOM_FILTER_FPP}, "
+                          f"DICTIONARY_SIZE_LIMIT {row_group_size * BLOOM_DICTIONARY_BYTES_PER_ROW})")
+    finally:
+        bloom_con.unregister('maintained')
+
+
+def compact_dataset(source_root, output_root, table_name, sort_by=None, zorder_by=None, row_group_size=ROW_GROUP_SIZE,
+                    target_file_bytes=TARGET_FILE_BYTES, bloom_con=None, parquet_options=None):
+    """Menulis ulang dataset berpartisi: per partisi semua file digabung, diklaster, lalu dipecah menjadi file seukuran target.
+
+    Jumlah baris per file diperkirakan dari ukuran file masukan per baris. Dengan `bloom_con` file
+    ditulis oleh DuckDB dengan bloom filter (lihat write_maintained_file). Mengembalikan
+    (jumlah file sebelum, jumlah file sesudah).
+    """
+    files_before, files_after = 0, 0
+    for partition, files in dataset_files(source_root).items():
+        table = pa.concat_tables([pq.read_table(path, partitioning=None) for path in files], promote_options='permissive')
+        table = cluster_table(table, sort_by, zorder_by)
+        bytes_per_row = sum(os.path.getsize(path) for path in files) / max(table.num_rows, 1)
+        rows_per_file = max(row_group_size, int(target_file_bytes / max(bytes_per_row, 1)))
+        output_dir = os.path.join(output_root, partition)
+        os.makedirs(output_dir, exist_ok=True)
+        for i in range(max(1, math.ceil(table.num_rows / rows_per_file))):
+            write_maintained_file(table.slice(i * rows_per_file, rows_per_file), os.path.join(output_dir, f'data_{i}.parquet'),
+                                  table_name, row_group_size, bloom_con, parquet_options)
+            files_after += 1
+        files_before += len(files)
+    return files_before, files_after
+
+
+def _parquet_list_sql(files):
+    """Literal daftar file untuk fungsi tabel Parquet DuckDB."""
+    return '[' + ', '.join(f"'{path}'" for path in files) + ']'
+
+
+def pruning_probe_values(fact_files):
+    """Nilai setiap PRUNING_PROBES, dihitung dari data fakta."""
+    con = duckdb.connect()
+    try:
+        con.execute(f"CREATE VIEW fact AS SELECT * FROM read_parquet({_parquet_list_sql(fact_files)})")
+        return {label: con.execute(sql).fetchone()[0] for label, _, sql in PRUNING_PROBES}
+    finally:
+        con.close()
+
+
+def pruning_report(fact_files, probe_values):
+    """Jumlah row group yang bisa dilewati DuckDB untuk setiap filter kesamaan PRUNING_PROBES.
+
+    Row group dilewati jika nilainya di luar min/max statistik kolom, atau (untuk yang lolos
+    min/max) jika bloom filter-nya menyatakan nilai itu tidak ada. Mengembalikan DataFrame per probe.
+    """
+    con = duckdb.connect()
+    files_sql = _parquet_list_sql(fact_files)
+    rows = []
+    try:
+        for label, column, _ in PRUNING_PROBES:
+            value = probe_values[label]
+            stats = con.execute(
+                f"SELECT file_name, row_group_id, TRY_CAST(stats_min_value AS BIGINT), TRY_CAST(stats_max_value AS BIGINT) "
+                f"FROM parquet_metadata({files_sql}) WHERE path_in_schema = ?", [column]).fetchall()
+            candidates = {(file_name, row_group) for file_name, row_group, low, high in stats
+                          if low is None or high is None or low <= value <= high}
+            bloom_excluded = {(file_name, row_group) for file_name, row_group, excluded in con.execute(
+                f"SELECT file_name, row_group_id, bloom_filter_excludes FROM parquet_bloom_probe({files_sql}, '{column}', {int(value)})").fetchall()
+                if excluded}
+            rows.append({'filter': f'{label} ({value})', 'row_groups': len(stats), 'skip_minmax': len(stats) - len(candidates),
+                         'skip_bloom': len(candidates & bloom_excluded)})
+    finally:
+        con.close()
+    return pd.DataFrame(rows).set_index('filter')
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from etl_common.key_lookup import build_key_lookup, date_to_sk, gather_keys
+
+# Kolom dimensi pada skema bintang (sama untuk DWH dan Gold)
+DIM_CUSTOMER_COLUMNS = ['customer_id', 'first_name', 'last_name', 'email', 'address_status', 'street_number', 'street_name', 'city', 'country_name']
+DIM_BOOK_COLUMNS = ['book_id', 'title', 'isbn13', 'language_code', 'language_name', 'num_pages', 'publication_date', 'publisher_name', 'author_name']
+FACT_SK_COLUMNS = ['customer_sk', 'book_sk', 'shipping_sk', 'date_sk']
+# (surrogate key, natural key) setiap dimensi; date_sk (YYYYMMDD) sekaligus menjadi natural key dim_date
+DIMENSION_SK_COLUMNS = {
+    'dim_customer': ('customer_sk', 'customer_id'),
+    'dim_book': ('book_sk', 'book_id'),
+    'dim_shipping': ('shipping_sk', 'shipping_method_id'),
+    'dim_date': ('date_sk', 'date_sk'),
+}
+
+
+def build_cleaned_customer(data):
+    """customer + alamat + negara + status alamat (satu baris per pasangan pelanggan-alamat)."""
+    df_cust_link = pd.merge(data['customer'], data['customer_address'], on='customer_id')
+    df_cust_addr = pd.merge(df_cust_link, data['address'], on='address_id')
+    df_cust_country = pd.merge(df_cust_addr, data['country'], on='country_id')
+    return pd.merge(df_cust_country, data['address_status'], on='status_id')
+
+
+def build_cleaned_book(data):
+    """book + penerbit + bahasa + nama penulis (digabung dengan koma)."""
+    df_b_pub = pd.merge(data['book'], data['publisher'], on='publisher_id', how='left')
+    df_b_pub_lang = pd.merge(df_b_pub, data['book_language'], on='language_id', how='left')
+    df_authors = pd.merge(data['book_author'], data['author'], on='author_id').groupby('book_id')['author_name'].apply(', '.join).reset_index()
+    return pd.merge(df_b_pub_lang, df_authors, on='book_id', how='left')
+
+
+def build_cleaned_order(data):
+    """order_line + cust_order + metode pengiriman (untuk biaya kirim `cost`)."""
+    cleaned_order = pd.merge(data['order_line'], data['cust_order'], on='order_id')
+    return pd.merge(cleaned_order, data['shipping_method'], left_on='shipping_method_id', right_on='method_id', how='left')
+
+
+def build_dim_customer(cleaned_customer):
+    """DimCustomer dari cleaned_customer."""
+    dim_customer = cleaned_customer[DIM_CUSTOMER_COLUMNS].copy()
+    dim_customer.rename(columns={'country_name': 'country'}, inplace=True)
+    return dim_customer
+
+
+def build_dim_book(cleaned_book):
+    """DimBook dari cleaned_book."""
+    return cleaned_book[DIM_BOOK_COLUMNS].copy()
+
+
+def build_dim_shipping(shipping_method):
+    """DimShipping dari tabel shipping_method."""
+    dim_shipping = shipping_method[['method_id', 'method_name']].copy()
+    dim_shipping.rename(columns={'method_id': 'shipping_method_id', 'method_name': 'shipping_method'}, inplace=True)
+    return dim_shipping
+
+
+def build_gold_dim_shipping(cleaned_order):
+    """DimShipping Gold: hanya metode yang muncul di pesanan, berurutan menurut kemunculan pertama.
+
+    Aturan yang sama dipakai GOLD_DIMENSION_QUERIES di transform_duckdb, sehingga SK-nya identik.
+    """
+    dim_shipping = cleaned_order[['shipping_method_id', 'method_name']].drop_duplicates().copy()
+    dim_shipping.rename(columns={'method_name': 'shipping_method'}, inplace=True)
+    return dim_shipping
+
+
+def build_dim_date(order_dates):
+    """DimDate harian dari tanggal pesanan minimum sampai maksimum (kosong jika tidak ada pesanan)."""
+    min_date = order_dates.min()
+    max_date = order_dates.max()
+    date_range = pd.date_range(start=min_date, end=max_date, freq='D') if pd.notna(min_date) else pd.DatetimeIndex([])
+    dim_date = pd.DataFrame(data=date_range, columns=['full_date'])
+    dim_date['date_sk'] = dim_date['full_date'].dt.strftime('%Y%m%d').astype(int)
+    dim_date['day_val'] = dim_date['full_date'].dt.day
+    dim_date['month_val'] = dim_date['full_date'].dt.month
+    dim_date['year_val'] = dim_date['full_date'].dt.year
+    dim_date['quarter_val'] = dim_date['full_date'].dt.quarter
+    dim_date['day_name'] = dim_date['full_date'].dt.day_name()
+    dim_date['month_name'] = dim_date['full_date'].dt.month_name()
+    return dim_date
+
+
+def add_surrogate_key(df, sk_column):
+    """Menambahkan surrogate key 1..n sebagai kolom pertama (SK dibuat di sisi klien)."""
+    df.insert(0, sk_column, range(1, 1 + len(df)))
+    return df
+
+
+def build_lookup(dim, sk_column, natural_column):
+    """Lookup natural key -> SK dari DataFrame dimensi yang SK-nya sudah ada."""
+    return build_key_lookup(dim[natural_column], dim[sk_column])
+
+
+def build_fact_book_sales(cleaned_order, lookups, extra_columns=()):
+    """Membangun fakta dari cleaned_order dan lookup dimensi (hasil build_key_lookup).
+
+    SK diambil lewat gather array dengan semantik left merge berantai (customer, book, shipping,
+    tanggal); baris tanpa SK, harga atau biaya kirim dibuang seperti dropna. `extra_columns`
+    dari cleaned_order ikut dibawa ke hasil (mis. line_id untuk menghitung watermark).
+    """
+    rows = np.arange(len(cleaned_order))
+    sk_arrays = {}
+    for sk_column, dim_name, natural_ids in [
+        ('customer_sk', 'dim_customer', cleaned_order['customer_id'].to_numpy()),
+        ('book_sk', 'dim_book', cleaned_order['book_id'].to_numpy()),
+        ('shipping_sk', 'dim_shipping', cleaned_order['shipping_method_id'].to_numpy()),
+        ('date_sk', 'dim_date', date_to_sk(cleaned_order['order_date'])),
+    ]:
+        row_index, surrogate_keys = gather_keys(lookups[dim_name], natural_ids[rows])
+        rows = rows[row_index]
+        sk_arrays = {column: values[row_index] for column, values in sk_arrays.items()}
+        sk_arrays[sk_column] = surrogate_keys
+
+    fact_book_sales = pd.DataFrame(sk_arrays)
+    fact_book_sales['price'] = cleaned_order['price'].to_numpy()[rows]
+    fact_book_sales['shipping_cost'] = cleaned_order['cost'].to_numpy()[rows]
+    for column in extra_columns:
+        fact_book_sales[column] = cleaned_order[column].to_numpy()[rows]
+    complete = (fact_book_sales[FACT_SK_COLUMNS] >= 0).all(axis=1) & fact_book_sales[['price', 'shipping_cost']].notna().all(axis=1)
+    return fact_book_sales[complete].reset_index(drop=True)
+
+
+def build_star_schema(cleaned_customer, cleaned_book, cleaned_order, dim_shipping, fact_extra_columns=()):
+    """Skema bintang lengkap dengan SK dibuat di sisi klien (1..n per dimensi).
+
+    `dim_shipping` diberikan pemanggil (tanpa SK) karena sumbernya bisa tabel shipping_method
+    maupun metode yang muncul di pesanan. `fact_extra_columns` diteruskan ke build_fact_book_sales.
+    Mengembalikan (dict dimensi, fakta).
+    """
+    dims = {
+        'dim_customer': add_surrogate_key(build_dim_customer(cleaned_customer), 'customer_sk'),
+        'dim_book': add_surrogate_key(build_dim_book(cleaned_book), 'book_sk'),
+        'dim_shipping': add_surrogate_key(dim_shipping, 'shipping_sk'),
+        'dim_date': build_dim_date(cleaned_order['order_date']),
+    }
+    lookups = {name: build_lookup(dim, *DIMENSION_SK_COLUMNS[name]) for name, dim in dims.items()}
+    return dims, build_fact_book_sales(cleaned_order, lookups, extra_columns=fact_extra_columns)
@@ -0,0 +1,168 @@
+import duckdb
+
+# Versi SQL DuckDB dari transformasi Silver/Gold di etl_common.transform. Setiap tabel masukan
+# didaftarkan sebagai view dengan kolom urutan __rn (urutan file lalu baris Parquet), sehingga
+# ORDER BY __rn setiap join mereproduksi urutan baris pd.merge: baris kiri sesuai urutan aslinya,
+# lalu pasangan kanan sesuai urutannya. Hasil dimaterialisasi di DuckDB (kolumnar, multi-thread,
+# bisa spill ke disk) lalu ditulis ke Parquet (Silver langsung dengan COPY, Gold lewat Arrow dan etl_common.schema).
+
+# Kolom urutan baris yang ditambahkan ke setiap view masukan (tidak ikut ditulis)
+ORDER_COLUMN = '__rn'
+
+SILVER_QUERIES = {
+    'cleaned_customer': """
+        SELECT c.* EXCLUDE (__rn), ca.* EXCLUDE (customer_id, __rn), a.* EXCLUDE (address_id, __rn),
+               co.* EXCLUDE (country_id, __rn), s.* EXCLUDE (status_id, __rn)
+        FROM customer c
+        JOIN customer_address ca ON ca.customer_id = c.customer_id
+        JOIN address a ON a.address_id = ca.address_id
+        JOIN country co ON co.country_id = a.country_id
+        JOIN address_status s ON s.status_id = ca.status_id
+        ORDER BY c.__rn, ca.__rn, a.__rn, co.__rn, s.__rn
+    """,
+    'cleaned_book': """
+        WITH authors AS (
+            SELECT ba.book_id, string_agg(a.author_name, ', ' ORDER BY ba.__rn, a.__rn) AS author_name
+            FROM book_author ba
+            JOIN author a ON a.author_id = ba.author_id
+            GROUP BY ba.book_id
+        )
+        SELECT b.* EXCLUDE (__rn), p.* EXCLUDE (publisher_id, __rn), l.* EXCLUDE (language_id, __rn), au.author_name
+        FROM book b
+        LEFT JOIN publisher p ON p.publisher_id = b.publisher_id
+        LEFT JOIN book_language l ON l.language_id = b.language_id
+        LEFT JOIN authors au ON au.book_id = b.book_id
+        ORDER BY b.__rn, p.__rn, l.__rn
+    """,
+    'cleaned_order': """
+        SELECT ol.* EXCLUDE (__rn), co.* EXCLUDE (order_id, __rn), sm.* EXCLUDE (__rn)
+        FROM order_line ol
+        JOIN cust_order co ON co.order_id = ol.order_id
+        LEFT JOIN shipping_method sm ON sm.method_id = co.shipping_method_id
+        ORDER BY ol.__rn, co.__rn, sm.__rn
+    """,
+}
+
+GOLD_DIMENSION_QUERIES = {
+    'dim_customer': """
+        SELECT row_number() OVER (ORDER BY __rn) AS customer_sk, customer_id, first_name, last_name, email, address_status,
+               street_number, street_name, city, country_name AS country
+        FROM cleaned_customer
+        ORDER BY __rn
+    """,
+    'dim_book': """
+        SELECT row_number() OVER (ORDER BY __rn) AS book_sk, book_id, title, isbn13, language_code, language_name,
+               num_pages, publication_date, publisher_name, author_name
+        FROM cleaned_book
+        ORDER BY __rn
+    """,
+    # Metode pengiriman yang muncul di pesanan, urut kemunculan pertama (seperti drop_duplicates)
+    'dim_shipping': """
+        SELECT row_number() OVER (ORDER BY first_rn) AS shipping_sk, shipping_method_id, shipping_method
+        FROM (SELECT shipping_method_id, method_name AS shipping_method, min(__rn) AS first_rn
+              FROM cleaned_order GROUP BY shipping_method_id, method_name)
+        ORDER BY first_rn
+    """,
+    # Rentang harian dari timestamp pesanan minimum (termasuk jam-nya, seperti pd.date_range) sampai maksimum
+    'dim_date': """
+        SELECT CAST(full_date AS TIMESTAMP_NS) AS full_date,
+               CAST(strftime(full_date, '%Y%m%d') AS BIGINT) AS date_sk,
+               CAST(day(full_date) AS INTEGER) AS day_val,
+               CAST(month(full_date) AS INTEGER) AS month_val,
+               CAST(year(full_date) AS INTEGER) AS year_val,
+               CAST(quarter(full_date) AS INTEGER) AS quarter_val,
+               dayname(full_date) AS day_name,
+               monthname(full_date) AS month_name
+        FROM (SELECT unnest(generate_series(CAST(min(order_date) AS TIMESTAMP), CAST(max(order_date) AS TIMESTAMP), INTERVAL 1 DAY)) AS full_date
+              FROM cleaned_order)
+        ORDER BY full_date
+    """,
+}
+
+# Fakta: sama dengan build_fact_book_sales (baris pelanggan ganda ikut dilipatgandakan, baris tanpa SK/harga/biaya dibuang).
+# Diurutkan per partisi lebih dulu agar pembacaan setiap partisi (iter_partitions) hanya menyentuh row group miliknya.
+FACT_QUERY = """
+    SELECT c.customer_sk, b.book_sk, s.shipping_sk, d.date_sk, o.price, o.cost AS shipping_cost,
+           d.date_sk // 10000 AS year_val, d.date_sk // 100 % 100 AS month_val
+    FROM cleaned_order o
+    JOIN dim_customer c ON c.customer_id = o.customer_id
+    JOIN dim_book b ON b.book_id = o.book_id
+    JOIN dim_shipping s ON s.shipping_method_id = o.shipping_method_id
+    JOIN dim_date d ON d.date_sk = CAST(strftime(o.order_date, '%Y%m%d') AS BIGINT)
+    WHERE o.price IS NOT NULL AND o.cost IS NOT NULL
+    ORDER BY year_val, month_val, o.__rn, c.customer_sk
+"""
+
+
+def connect(s3_settings=None):
+    """Koneksi DuckDB in-memory memakai semua core; `s3_settings` (dict SET) mengaktifkan httpfs untuk MinIO."""
+    con = duckdb.connect(database=':memory:')
+    if s3_settings:
+        con.execute("INSTALL httpfs; LOAD httpfs;")
+        for option, value in s3_settings.items():
+            con.execute(f"SET {option} = {value!r};" if isinstance(value, str) else f"SET {option} = {str(value).lower()};")
+    # Urutan baris hasil ORDER BY harus sampai ke file Parquet
+    con.execute("SET preserve_insertion_order = true;")
+    return con
+
+
+def register_parquet(con, name, source):
+    """Mendaftarkan file/glob (atau daftar file berurutan) Parquet sebagai view `name` dengan kolom urutan __rn.
+
+    __rn = jumlah baris file-file sebelumnya (dari metadata footer) + nomor baris di dalam file,
+    sehingga tidak perlu window/sort atas seluruh tabel. File glob diurutkan menurut nama,
+    sedangkan daftar file dipakai sesuai urutannya.
+    """
+    if isinstance(source, str):
+        source_sql = f"'{source}'"
+        files = con.execute(f'SELECT file_name, num_rows FROM parquet_file_metadata({source_sql}) ORDER BY file_name').fetchall()
+    else:
+        source_sql = '[' + ', '.join(f"'{path}'" for path in source) + ']'
+        num_rows = dict(con.execute(f'SELECT file_name, num_rows FROM parquet_file_metadata({source_sql})').fetchall())
+        files = [(path, num_rows[path]) for path in source]
+    offsets, row_offset = [], 0
+    for file_name, rows in files:
+        offsets.append(f"('{file_name}', {row_offset})")
+        row_offset += rows
+    con.execute(f"""
+        CREATE OR REPLACE VIEW {name} AS
+        SELECT p.* EXCLUDE (filename, file_row_number), f.row_offset + p.file_row_number AS {ORDER_COLUMN}
+        FROM read_parquet({source_sql}, filename = true, file_row_number = true) p
+        JOIN (VALUES {', '.join(offsets)}) f(file_name, row_offset) ON f.file_name = p.filename
+    """)
+
+
+def materialize(con, name, sql):
+    """Menjalankan transformasi dan menyimpan hasilnya sebagai tabel sementara (urutan baris dipertahankan)."""
+    con.execute(f'CREATE OR REPLACE TEMP TABLE {name} AS {sql}')
+    return con.execute(f'SELECT COUNT(*) FROM {name}').fetchone()[0]
+
+
+def pandas_compatible_columns(con, name):
+    """Daftar SELECT yang menyamakan tipe dengan jalur pandas: kolom integer berisi null menjadi DOUBLE."""
+    columns = con.execute(f'DESCRIBE {name}').fetchall()
+    int_columns = [column for column, column_type, *_ in columns if column_type in ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT')]
+    has_nulls = {}
+    if int_columns:
+        counts = con.execute('SELECT ' + ', '.join(f'COUNT(*) - COUNT("{column}")' for column in int_columns) + f' FROM {name}').fetchone()
+        has_nulls = dict(zip(int_columns, counts))
+    return [f'CAST("{column}" AS DOUBLE) AS "{column}"' if has_nulls.get(column) else f'"{column}"' for column, *_ in columns]
+
+
+def copy_to_parquet(con, name, path):
+    """Menulis tabel sementara ke Parquet langsung dari DuckDB."""
+    columns = pandas_compatible_columns(con, name)
+    con.execute(f"COPY (SELECT {', '.join(columns)} FROM {name}) TO '{path}' (FORMAT parquet)")
+
+
+def iter_partitions(con, name, partition_by):
+    """(dict nilai partisi, Arrow Table tanpa kolom partisi) untuk setiap partisi tabel sementara, urut nilai partisi.
+
+    Setiap partisi dibaca dengan SELECT tersendiri karena urutan baris di dalam partisi harus
+    dipertahankan (PARTITION_BY DuckDB tidak menjaminnya).
+    """
+    partitions = con.execute(f"SELECT DISTINCT {', '.join(partition_by)} FROM {name} ORDER BY ALL").fetchall()
+    where = ' AND '.join(f'{column} = ?' for column in partition_by)
+    for values in partitions:
+        table = con.execute(f"SELECT * EXCLUDE ({', '.join(partition_by)}) FROM {name} WHERE {where}", list(values)).fetch_arrow_table()
+        yield dict(zip(partition_by, values)), table
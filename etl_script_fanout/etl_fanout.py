@@ -0,0 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import os
+import sys
+import time
+
+import pyarrow.parquet as pq
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPT_DIR, '..'))
+sys.path.append(os.path.join(SCRIPT_DIR, '..', 'etl_script_dwh'))
+sys.path.append(os.path.join(SCRIPT_DIR, '..', 'etl_script_dlh'))
+from etl_common.bulk_load import LOAD_METHODS, bulk_load_dataframe
+from etl_common.extract import read_table_as_arrow, run_tables_in_parallel
+from etl_common.schema import compact_tables
+from etl_common.transform import build_gold_dim_shipping, build_star_schema
+import etl_dwh
+import etl_lakehouse
+
+# --- 1. KONFIGURASI ---
+# Koneksi sumber, DWH dan lake diambil dari etl_dwh / etl_lakehouse (termasuk override GRAVITY_*)
+SINKS = ['dwh', 'lakehouse']
+EXTRACT_CHUNK_SIZE = 100_000
+EXTRACT_WORKERS = 4
+LOAD_METHOD = etl_dwh.LOAD_METHOD
+
+
+def extract_source(chunk_size=EXTRACT_CHUNK_SIZE, workers=EXTRACT_WORKERS):
+    """Mengekstrak ke-13 tabel sumber SATU kali sebagai Arrow Table.
+
+    Hasil Arrow langsung ditulis sebagai Bronze; salinan pandas dipakai untuk transformasi.
+    """
+    print("Memulai proses ekstraksi data (sekali untuk semua sink)...")
+    workers = min(workers, etl_dwh.SOURCE_POOL_SIZE)
+
+    def extract_table(table):
+        arrow_table = read_table_as_arrow(etl_dwh.source_engine, table, chunk_size)
+        return arrow_table, f"Berhasil mengekstrak tabel: {table} ({arrow_table.num_rows} baris)"
+
+    raw_tables = run_tables_in_parallel(etl_lakehouse.BRONZE_TABLES, extract_table, workers)
+    print("Proses ekstraksi data selesai.")
+    return raw_tables
+
+
+def build_conformed_tables(data):
+    """Membangun Silver dan skema bintang yang terkonformasi SATU kali untuk kedua sink.
+
+    SK dibuat di sisi klien (1..n) sehingga DWH dan Gold memakai kunci yang sama; DimShipping
+    mengikuti aturan Gold (build_gold_dim_shipping) agar Gold sama dengan etl_lakehouse. Mengembalikan juga watermark fakta untuk
+    DWH: MAX(line_id), atau None jika ada order_line yang tidak menjadi fakta (pesanannya belum
+    terbaca atau SK-nya tidak ditemukan) karena tidak ada watermark yang benar untuk load itu.
+    """
+    print("Memulai proses transformasi (sekali untuk semua sink)...")
+    silver = etl_lakehouse.build_silver_tables(data)
+    dims, fact_book_sales = build_star_schema(silver['cleaned_customer'], silver['cleaned_book'], silver['cleaned_order'],
+                                              build_gold_dim_shipping(silver['cleaned_order']), fact_extra_columns=['line_id'])
+    line_ids = data['order_line']['line_id']
+    fact_watermark, unresolved = etl_dwh.resolved_line_watermark(line_ids, fact_book_sales['line_id'],
+                                                                 int(line_ids.max()) if len(line_ids) > 0 else None)
+    if len(unresolved) > 0:
+        fact_watermark = None
+        print(f"  - Peringatan: {len(unresolved)} order_line tanpa pesanan atau SK dimensi (line_id pertama {unresolved[0]}); "
+              f"watermark fakta DWH tidak disimpan.")
+    fact_book_sales = fact_book_sales.drop(columns='line_id')
+    tables = compact_tables({**dims, 'fact_book_sales': fact_book_sales})
+    fact_book_sales = tables.pop('fact_book_sales')
+    dims = tables
+    print("Proses transformasi selesai.")
+    return silver, dims, fact_book_sales, fact_watermark
+
+
+def write_dwh_sink(dims, fact_book_sales, fact_watermark, load_method=LOAD_METHOD, rebuild_indexes=False):
+    """Sink DWH: kosongkan tabel lalu muat dimensi (dengan SK dari klien) dan fakta."""
+    etl_dwh.ensure_load_state_table()
+    etl_dwh.prepare_dwh_tables()
+    etl_dwh.ensure_tracking_columns()
+    for name in ['dim_date', 'dim_customer', 'dim_shipping', 'dim_book']:
+        etl_dwh.load_dimension(name, dims[name], load_method=load_method, rebuild_indexes=rebuild_indexes)
+    if len(fact_book_sales) > 0:
+        # Watermark disimpan di transaksi insert fakta agar `etl_dwh.py --mode incremental` bisa melanjutkan dari load ini
+        after_insert = None
+        if fact_watermark is not None:
+            after_insert = lambda connection: etl_dwh.save_watermark(etl_dwh.FACT_WATERMARK_KEY, fact_watermark, connection)
+        bulk_load_dataframe(fact_book_sales, 'fact_book_sales', etl_dwh.dwh_engine, method=load_method,
+                            batch_size=etl_dwh.LOAD_BATCH_SIZE, rebuild_indexes=rebuild_indexes, after_insert=after_insert)
+    etl_dwh.save_load_batch()
+    return f"{sum(len(df) for df in dims.values())} baris dimensi dan {len(fact_book_sales)} baris fakta dimuat ke DWH."
+
+
+def write_lakehouse_sink(raw_tables, silver, dims, fact_book_sales, chunk_size=EXTRACT_CHUNK_SIZE, workers=EXTRACT_WORKERS):
+    """Sink lakehouse: Bronze dari Arrow hasil ekstraksi, lalu Silver dan Gold dari tabel yang sudah dibangun."""
+    etl_lakehouse.prepare_lakehouse_layers()
+    fs = etl_lakehouse.get_lake_fs()
+
+    def write_bronze_table(table):
+        with fs.open(f'{etl_lakehouse.LAKE_ROOT}/bronze/{table}.parquet', 'wb') as f:
+            pq.write_table(raw_tables[table], f, row_group_size=chunk_size)
+        return None, f"Berhasil menyimpan {table}.parquet ke Bronze Layer ({raw_tables[table].num_rows} baris)."
+
+    run_tables_in_parallel(etl_lakehouse.BRONZE_TABLES, write_bronze_table, workers)
+    etl_lakehouse.write_silver_tables(silver)
+    etl_lakehouse.write_gold_tables(dims, fact_book_sales)
+    return f"Bronze, Silver dan Gold ditulis ke {etl_lakehouse.LAKE_ROOT}."
+
+
+def run_sinks(sink_fns):
+    """Menjalankan setiap sink di thread sendiri; kegagalan satu sink tidak menghentikan sink lain.
+
+    Mengembalikan daftar sink yang gagal.
+    """
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, len(sink_fns))) as executor:
+        futures = {executor.submit(sink_fn): (name, time.perf_counter()) for name, sink_fn in sink_fns.items()}
+        for future in as_completed(futures):
+            name, start = futures[future]
+            try:
+                message = future.result()
+                print(f"  [{name}] {message} [{time.perf_counter() - start:.2f} detik]")
+            except Exception as e:
+                failed.append(name)
+                print(f"  [{name}] GAGAL: {e}")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pipeline ETL fan-out Gravity Books: ekstrak & transformasi sekali, tulis ke DWH dan lakehouse bersamaan.')
+    parser.add_argument('--sink', action='append', choices=SINKS, help='Sink yang ditulis (boleh diulang; default: semua).')
+    parser.add_argument('--chunk-size', type=int, default=EXTRACT_CHUNK_SIZE, help='Jumlah baris per chunk ekstraksi / row group Bronze.')
+    parser.add_argument('--workers', type=int, default=EXTRACT_WORKERS, help='Jumlah tabel yang diekstrak (dan ditulis ke Bronze) bersamaan.')
+    parser.add_argument('--load-method', choices=LOAD_METHODS, default=LOAD_METHOD, help='Metode pemuatan ke DWH.')
+    parser.add_argument('--rebuild-indexes', action='store_true', help='Drop indeks sekunder DWH sebelum load dan bangun ulang sesudahnya.')
+    args = parser.parse_args()
+    sinks = args.sink or SINKS
+
+    start_time = time.time()
+
+    raw_tables = extract_source(chunk_size=args.chunk_size, workers=args.workers)
+    source_data = {table: arrow_table.to_pandas() for table, arrow_table in raw_tables.items()}
+    silver, dims, fact_book_sales, fact_watermark = build_conformed_tables(source_data)
+    del source_data
+
+    sink_fns = {}
+    if 'dwh' in sinks:
+        sink_fns['dwh'] = lambda: write_dwh_sink(dims, fact_book_sales, fact_watermark, load_method=args.load_method, rebuild_indexes=args.rebuild_indexes)
+    if 'lakehouse' in sinks:
+        sink_fns['lakehouse'] = lambda: write_lakehouse_sink(raw_tables, silver, dims, fact_book_sales, chunk_size=args.chunk_size, workers=args.workers)
+    print(f"\nMenulis ke sink: {', '.join(sink_fns)} (bersamaan)...")
+    failed = run_sinks(sink_fns)
+
+    end_time = time.time()
+    print(f"\nPipeline ETL fan-out selesai dalam {end_time - start_time:.2f} detik.")
+    if failed:
+        sys.exit(f"Sink gagal: {', '.join(failed)}")
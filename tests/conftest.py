@@ -0,0 +1,88 @@
+import importlib.util
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmark.stand_ins import build_source_sqlite, create_dwh_schema
+
+
+def load_script(module_name, relative_path):
+    """Mengimpor skrip pipeline sebagai modul (seperti benchmark/run_benchmark.py)."""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def execute(path, *statements):
+    """Menjalankan beberapa statement SQL pada database SQLite lalu commit."""
+    connection = sqlite3.connect(path)
+    try:
+        for statement in statements:
+            connection.execute(statement)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+@pytest.fixture(scope='session')
+def seed_source(tmp_path_factory):
+    """Database sumber stand-in (source_sql/ + transaksi NumPy), dibangun sekali per sesi."""
+    path = str(tmp_path_factory.mktemp('source') / 'source.db')
+    build_source_sqlite(path)
+    return path
+
+
+@pytest.fixture(scope='session')
+def etl_dwh(tmp_path_factory, seed_source):
+    """Modul etl_script_dwh/etl_dwh.py; engine-nya diganti per tes oleh fixture `dwh`."""
+    placeholder = tmp_path_factory.mktemp('placeholder')
+    os.environ['GRAVITY_SOURCE_DB_URL'] = f'sqlite:///{seed_source}'
+    os.environ['GRAVITY_DWH_DB_URL'] = f"sqlite:///{placeholder / 'dwh.db'}"
+    return load_script('etl_dwh', 'etl_script_dwh/etl_dwh.py')
+
+
+@pytest.fixture
+def source(tmp_path, seed_source):
+    """Salinan database sumber milik satu tes (boleh diubah)."""
+    path = str(tmp_path / 'source.db')
+    shutil.copy(seed_source, path)
+    return path
+
+
+@pytest.fixture
+def dwh(etl_dwh, source, tmp_path, monkeypatch):
+    """etl_dwh yang membaca `source` dan menulis ke DWH SQLite kosong milik satu tes."""
+    dwh_engine = create_engine(f"sqlite:///{tmp_path / 'dwh.db'}")
+    create_dwh_schema(dwh_engine)
+    source_engine = create_engine(f'sqlite:///{source}', pool_size=etl_dwh.SOURCE_POOL_SIZE, max_overflow=0)
+    monkeypatch.setattr(etl_dwh, 'dwh_engine', dwh_engine)
+    monkeypatch.setattr(etl_dwh, 'source_engine', source_engine)
+    yield etl_dwh
+    dwh_engine.dispose()
+    source_engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def lakehouse_session(tmp_path_factory, seed_source):
+    """Modul test_queries dengan sesi DuckDB atas lake Gold lokal yang dibangun etl_lakehouse dari sumber stand-in."""
+    work_dir = tmp_path_factory.mktemp('lake')
+    os.environ['GRAVITY_SOURCE_DB_URL'] = f'sqlite:///{seed_source}'
+    os.environ['GRAVITY_LAKE_ROOT'] = str(work_dir / 'lake')
+    os.environ['GRAVITY_LAYER_CACHE_DIR'] = str(work_dir / 'layer_cache')
+    etl_lakehouse = load_script('etl_lakehouse', 'etl_script_dlh/etl_lakehouse.py')
+    etl_lakehouse.prepare_lakehouse_layers()
+    etl_lakehouse.run_bronze_layer(workers=2)
+    etl_lakehouse.run_silver_layer()
+    etl_lakehouse.run_gold_layer()
+    test_queries = load_script('test_queries', 'test_queries/test_queries.py')
+    test_queries.get_lakehouse_connection()
+    yield test_queries
+    test_queries.close_sessions()
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from tests.conftest import execute, load_script
+
+
+@pytest.fixture
+def source_data(source):
+    """Ke-13 tabel sumber sebagai pandas, dengan satu metode pengiriman yang belum dipakai pesanan."""
+    execute(source, "INSERT INTO shipping_method (method_id, method_name, cost) VALUES (9, 'Drone', 99.0)")
+    engine = create_engine(f'sqlite:///{source}')
+    etl_lakehouse = load_script('etl_lakehouse_fanout_test', 'etl_script_dlh/etl_lakehouse.py')
+    with engine.connect() as connection:
+        data = {table: pd.read_sql_table(table, connection) for table in etl_lakehouse.BRONZE_TABLES}
+    engine.dispose()
+    return data
+
+
+def test_fanout_gold_matches_lakehouse_gold(etl_dwh, source_data):
+    etl_fanout = load_script('etl_fanout', 'etl_script_fanout/etl_fanout.py')
+    etl_lakehouse = etl_fanout.etl_lakehouse
+    silver, dims, fact_book_sales, _ = etl_fanout.build_conformed_tables(source_data)
+    expected_dims, expected_fact = etl_lakehouse.build_gold_tables(silver['cleaned_customer'], silver['cleaned_book'], silver['cleaned_order'])
+
+    assert 9 not in set(dims['dim_shipping']['shipping_method_id'])
+    assert sorted(dims) == sorted(expected_dims)
+    for name, dim in expected_dims.items():
+        pd.testing.assert_frame_equal(dims[name], dim, obj=name)
+    pd.testing.assert_frame_equal(fact_book_sales, expected_fact)
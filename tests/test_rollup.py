@@ -0,0 +1,153 @@
+import re
+
+import pandas as pd
+import pytest
+
+from etl_common.rollup import add_partition_filters, rewrite_query
+
+# Jumlah baris rollup rekaan: rollup terkecil yang mencakup kueri yang dipilih
+ROLLUP_ROWS = {'agg_month_book': 4, 'agg_month_customer': 3, 'agg_month_country': 2, 'agg_month_shipping': 1}
+
+
+@pytest.mark.parametrize('sql, rollup', [
+    ("SELECT d.year_val, d.month_name, COUNT(f.book_sk) AS n, SUM(f.price) AS total FROM fact_book_sales f "
+     "JOIN dim_date d ON f.date_sk = d.date_sk GROUP BY d.year_val, d.month_val, d.month_name", 'agg_month_shipping'),
+    ("SELECT b.title, COUNT(*) AS n FROM fact_book_sales f JOIN dim_book b ON f.book_sk = b.book_sk GROUP BY b.book_sk, b.title",
+     'agg_month_book'),
+    ("SELECT c.email, SUM(f.price + f.shipping_cost) AS total FROM fact_book_sales AS f JOIN dim_customer AS c "
+     "ON c.customer_sk = f.customer_sk GROUP BY c.customer_sk, c.email", 'agg_month_customer'),
+    ("SELECT c.country, SUM(f.price) AS total FROM fact_book_sales f JOIN dim_customer c ON f.customer_sk = c.customer_sk "
+     "GROUP BY c.country", 'agg_month_country'),
+    ("SELECT s.shipping_method, COUNT(*) AS n FROM fact_book_sales f INNER JOIN dim_shipping s ON f.shipping_sk = s.shipping_sk "
+     "GROUP BY s.shipping_method", 'agg_month_shipping'),
+    # Kolom partisi fakta dan beberapa dimensi sekaligus
+    ("SELECT b.title, d.year_val, SUM(f.price) AS total FROM fact_book_sales f JOIN dim_book b ON f.book_sk = b.book_sk "
+     "JOIN dim_date d ON f.date_sk = d.date_sk WHERE f.year_val = 2024 GROUP BY b.title, d.year_val", 'agg_month_book'),
+    ("SELECT f.customer_sk, COUNT(*) AS n FROM fact_book_sales f GROUP BY f.customer_sk", 'agg_month_customer'),
+])
+def test_rewritten_shapes(sql, rollup):
+    routed, name = rewrite_query(sql, ROLLUP_ROWS)
+    assert name == rollup
+    assert 'fact_book_sales' not in routed and f'FROM {rollup} ' in routed
+
+
+@pytest.mark.parametrize('sql', [
+    # Outer join
+    "SELECT b.title, COUNT(*) AS n FROM fact_book_sales f LEFT JOIN dim_book b ON f.book_sk = b.book_sk GROUP BY b.title",
+    # Kolom dim_date di bawah grain bulan
+    "SELECT d.full_date, SUM(f.price) AS total FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk GROUP BY d.full_date",
+    "SELECT d.day_name, COUNT(*) AS n FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk GROUP BY d.day_name",
+    # Kolom fakta tanpa alias
+    "SELECT s.shipping_method, SUM(price) AS total FROM fact_book_sales f JOIN dim_shipping s ON f.shipping_sk = s.shipping_sk "
+    "GROUP BY s.shipping_method",
+    # Kolom fakta yang bukan measure atau bukan grain rollup
+    "SELECT s.shipping_method, SUM(f.book_sk) AS x FROM fact_book_sales f JOIN dim_shipping s ON f.shipping_sk = s.shipping_sk "
+    "GROUP BY s.shipping_method",
+    "SELECT f.date_sk, COUNT(*) AS n FROM fact_book_sales f GROUP BY f.date_sk",
+    "SELECT f.price, COUNT(*) AS n FROM fact_book_sales f GROUP BY f.price",
+    # Agregat yang tidak bisa dijawab dari jumlah
+    "SELECT s.shipping_method, AVG(f.price) AS x FROM fact_book_sales f JOIN dim_shipping s ON f.shipping_sk = s.shipping_sk "
+    "GROUP BY s.shipping_method",
+    "SELECT s.shipping_method, COUNT(DISTINCT f.customer_sk) AS x FROM fact_book_sales f "
+    "JOIN dim_shipping s ON f.shipping_sk = s.shipping_sk GROUP BY s.shipping_method",
+    "SELECT s.shipping_method, SUM(f.price * 2) AS x FROM fact_book_sales f JOIN dim_shipping s ON f.shipping_sk = s.shipping_sk "
+    "GROUP BY s.shipping_method",
+    # Literal desimal terbaca sebagai alias.kolom yang tidak dikenal
+    "SELECT s.shipping_method, SUM(f.price) * 1.5 AS x FROM fact_book_sales f JOIN dim_shipping s ON f.shipping_sk = s.shipping_sk "
+    "GROUP BY s.shipping_method",
+    # Join yang tidak lewat surrogate key dimensinya, dan subquery
+    "SELECT b.title, COUNT(*) AS n FROM fact_book_sales f JOIN dim_book b ON f.customer_sk = b.book_sk GROUP BY b.title",
+    "SELECT COUNT(*) AS n FROM (SELECT f.book_sk FROM fact_book_sales f) t",
+])
+def test_fallback_shapes(sql):
+    routed, name = rewrite_query(sql, ROLLUP_ROWS)
+    assert name is None and routed == sql
+
+
+def test_customer_attribute_needs_customer_rollup():
+    sql = "SELECT c.city, SUM(f.price) AS total FROM fact_book_sales f JOIN dim_customer c ON f.customer_sk = c.customer_sk GROUP BY c.city"
+    assert rewrite_query(sql, ROLLUP_ROWS)[1] == 'agg_month_customer'
+    assert rewrite_query(sql, {'agg_month_country': 1})[1] is None
+
+
+def test_unavailable_rollup_is_not_used():
+    sql = "SELECT b.title, COUNT(*) AS n FROM fact_book_sales f JOIN dim_book b ON f.book_sk = b.book_sk GROUP BY b.title"
+    assert rewrite_query(sql, {'agg_month_shipping': 1}) == (sql, None)
+
+
+def test_country_rollup_drops_customer_join():
+    sql = ("SELECT c.country, SUM(f.price) AS total FROM fact_book_sales f JOIN dim_customer c ON f.customer_sk = c.customer_sk "
+           "GROUP BY c.country ORDER BY c.country")
+    routed, name = rewrite_query(sql, ROLLUP_ROWS)
+    assert name == 'agg_month_country'
+    assert 'dim_customer' not in routed and 'f.country' in routed and 'SUM(f.price_sum)' in routed
+
+
+def test_routed_queries_match_fact_results(lakehouse_session):
+    Q = lakehouse_session
+    con = Q.get_lakehouse_connection()
+    assert set(Q._rollup_rows) == set(ROLLUP_ROWS)
+    for name, sql in Q.queries.items():
+        routed, rollup = rewrite_query(sql, Q._rollup_rows)
+        assert rollup is not None, name
+        expected, actual = con.execute(sql).fetchdf(), con.execute(routed).fetchdf()
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, obj=name)
+
+
+# Kueri yang dipotong per tanggal lewat dim_date (bukan lewat kolom partisi fakta)
+DATE_SLICED_QUERY = """
+    SELECT d.month_name, COUNT(*) AS n, SUM(f.price) AS total
+    FROM fact_book_sales f
+    JOIN dim_date d ON f.date_sk = d.date_sk
+    WHERE d.year_val = 2024 AND d.month_val BETWEEN 1 AND 3
+    GROUP BY d.month_val, d.month_name
+    ORDER BY d.month_val;
+"""
+
+
+@pytest.mark.parametrize('sql, filters', [
+    (DATE_SLICED_QUERY, ['f.year_val = 2024', 'f.month_val BETWEEN 1 AND 3']),
+    ("SELECT COUNT(*) FROM fact_book_sales AS f JOIN dim_date AS d ON d.date_sk = f.date_sk WHERE d.month_val IN (1, 2) AND d.day_val = 3",
+     ['f.month_val IN (1, 2)']),
+    ("SELECT COUNT(*) FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk WHERE d.year_val >= 2023 LIMIT 5",
+     ['f.year_val >= 2023']),
+])
+def test_partition_filters_derived_from_dim_date(sql, filters):
+    routed = add_partition_filters(sql)
+    where = routed[routed.index('WHERE'):]
+    assert all(f'AND {condition}' in where for condition in filters)
+    assert re.sub(r'\s+', ' ', routed).count(' AND f.') == len(filters)
+
+
+@pytest.mark.parametrize('sql', [
+    # OR atau NOT di WHERE, outer join, join tidak lewat date_sk, kolom bukan partisi, nilai bukan literal
+    "SELECT COUNT(*) FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk WHERE d.year_val = 2024 OR d.month_val = 1",
+    "SELECT COUNT(*) FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk WHERE NOT d.year_val = 2024",
+    "SELECT COUNT(*) FROM fact_book_sales f LEFT JOIN dim_date d ON f.date_sk = d.date_sk WHERE d.year_val = 2024",
+    "SELECT COUNT(*) FROM fact_book_sales f JOIN dim_date d ON f.customer_sk = d.date_sk WHERE d.year_val = 2024",
+    "SELECT COUNT(*) FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk WHERE d.quarter_val = 1",
+    "SELECT COUNT(*) FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk WHERE d.year_val = 2020 + 4",
+    "SELECT COUNT(*) FROM fact_book_sales f JOIN dim_date d ON f.date_sk = d.date_sk GROUP BY d.year_val",
+])
+def test_partition_filters_not_derived(sql):
+    assert add_partition_filters(sql) == sql
+
+
+def files_read(con, sql):
+    """Jumlah file Parquet yang dibaca DuckDB untuk sebuah kueri (dari EXPLAIN ANALYZE)."""
+    plan = '\n'.join(row[1] for row in con.execute(f'EXPLAIN ANALYZE {sql}').fetchall())
+    return sum(int(count) for count in re.findall(r'Total Files Read:\s*(\d+)', plan))
+
+
+@pytest.mark.parametrize('use_rollups', [False, True])
+def test_date_sliced_query_prunes_partitions(lakehouse_session, monkeypatch, use_rollups):
+    Q = lakehouse_session
+    con = Q.get_lakehouse_connection()
+    monkeypatch.setattr(Q, 'USE_ROLLUPS', use_rollups)
+    monkeypatch.setattr(Q, '_routed_queries', {})
+    routed = Q.route_query(DATE_SLICED_QUERY)
+    assert 'f.year_val = 2024' in routed and ('agg_month_' in routed) == use_rollups
+    expected, actual = con.execute(DATE_SLICED_QUERY).fetchdf(), con.execute(routed).fetchdf()
+    assert len(expected) == 3
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert files_read(con, routed) < files_read(con, DATE_SLICED_QUERY) / 4